@@ -7,7 +7,7 @@ from datetime import datetime
 from pathlib import Path
 from typing import List, Optional
 
-from core.locks import set_locked  # важно
+from core.locks import set_locked_many  # важно
 
 
 @dataclass(frozen=True)
@@ -18,36 +18,51 @@ class AttrsRequest:
     atime: Optional[datetime] = None
 
 
+def _to_ns(dt: datetime) -> int:
+    """datetime -> целые наносекунды без потери точности через float."""
+    return int(dt.replace(microsecond=0).timestamp()) * 1_000_000_000 + dt.microsecond * 1000
+
+
 def apply_attrs(paths: List[Path], req: AttrsRequest) -> None:
+    if req.set_readonly is None and req.set_locked is None and req.mtime is None and req.atime is None:
+        return
+
+    to_lock: List[Path] = []
+
     for p in paths:
-        p = p.expanduser().resolve()
-        if not p.exists():
+        p = p.expanduser()
+
+        # один stat на путь: он же проверка существования, его же используем для chmod и utime
+        try:
+            st = os.stat(p)
+        except OSError:
             continue
 
         # read-only
         if req.set_readonly is not None:
             try:
-                mode = p.stat().st_mode
                 if req.set_readonly:
-                    os.chmod(p, mode & ~stat.S_IWUSR)
+                    os.chmod(p, st.st_mode & ~stat.S_IWUSR)
                 else:
-                    os.chmod(p, mode | stat.S_IWUSR)
+                    os.chmod(p, st.st_mode | stat.S_IWUSR)
             except Exception:
                 pass
 
-        # locked (внутренняя блокировка менеджера)
+        # locked (внутренняя блокировка менеджера) — копим и пишем одним набором после цикла
         if req.set_locked is not None:
-            try:
-                set_locked(p, req.set_locked)
-            except Exception:
-                pass
+            to_lock.append(p)
 
         # times
         if req.mtime is not None or req.atime is not None:
             try:
-                st = p.stat()
-                at = req.atime.timestamp() if req.atime else st.st_atime
-                mt = req.mtime.timestamp() if req.mtime else st.st_mtime
-                os.utime(p, (at, mt))
+                at_ns = _to_ns(req.atime) if req.atime else st.st_atime_ns
+                mt_ns = _to_ns(req.mtime) if req.mtime else st.st_mtime_ns
+                os.utime(p, ns=(at_ns, mt_ns))
             except Exception:
                 pass
+
+    if to_lock:
+        try:
+            set_locked_many(to_lock, req.set_locked)
+        except Exception:
+            pass
@@ -2,7 +2,8 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from pathlib import Path
-from typing import List
+from typing import List, Optional, Tuple
+import os
 import re
 
 
@@ -12,21 +13,50 @@ class RenamePlanItem:
     dst: Path
 
 
-def _apply_template(idx: int, template: str) -> str:
+_TPL_RE = re.compile(r"\{n(?::([0-9]+))?\}")
+
+
+def _parse_template(template: str) -> Tuple[List[str], List[int]]:
     """
+    Разбирает шаблон один раз на весь план: литералы между маркерами и ширины маркеров
+    (литералов всегда на один больше, чем маркеров).
     Поддержка:
       {n}        -> 1,2,3
       {n:03}     -> 001,002,003
       {n:5}      -> 00001 (как padding)
     """
-    def repl(m: re.Match) -> str:
+    literals: List[str] = []
+    widths: List[int] = []
+    pos = 0
+    for m in _TPL_RE.finditer(template):
+        literals.append(template[pos:m.start()])
         width = m.group(1)
-        if width:
-            w = int(width)
-            return str(idx).zfill(w)
-        return str(idx)
+        widths.append(int(width) if width else 0)
+        pos = m.end()
+    literals.append(template[pos:])
+    return literals, widths
+
+
+def _apply_template(idx: int, parts: Tuple[List[str], List[int]]) -> str:
+    literals, widths = parts
+    if len(widths) == 1:
+        # обычный случай — один маркер: просто склейка строк
+        return literals[0] + str(idx).zfill(widths[0]) + literals[1]
 
-    return re.sub(r"\{n(?::([0-9]+))?\}", repl, template)
+    num = str(idx)
+    out = [literals[0]]
+    for w, lit in zip(widths, literals[1:]):
+        out.append(num.zfill(w))
+        out.append(lit)
+    return "".join(out)
+
+
+def _split_name(name: str) -> Tuple[str, str]:
+    """(stem, suffix) по тем же правилам, что Path.stem/Path.suffix: "name." и ".bashrc" — без расширения."""
+    i = name.rfind(".")
+    if 0 < i < len(name) - 1:
+        return name[:i], name[i:]
+    return name, ""
 
 
 def build_plan(
@@ -60,11 +90,14 @@ def build_plan(
         if not a:
             raise ValueError("Для режима «Замена текста» нужно заполнить поле A (что искать).")
 
+    pat: Optional[re.Pattern] = None
+    tpl_parts: Tuple[List[str], List[int]] = ([], [])
+
     if mode == "regex":
         if not a:
             raise ValueError("Для режима «Regex замена» нужно заполнить поле A (regex).")
         try:
-            re.compile(a)
+            pat = re.compile(a)
         except re.error as e:
             raise ValueError(f"Некорректное регулярное выражение: {e}")
 
@@ -74,13 +107,15 @@ def build_plan(
             raise ValueError("Для режима «Шаблон» нужно заполнить поле «Шаблон» или поле B.")
         if "{n" not in tpl:
             raise ValueError("В шаблоне должен быть маркер {n} (например file_{n:03}).")
+        tpl_parts = _parse_template(tpl)
 
     out: List[RenamePlanItem] = []
     idx = start
     for p in paths:
-        parent = p.parent
-        stem = p.stem
-        suffix = p.suffix
+        # os.path.split + _split_name вместо Path.parent/.stem/.suffix — без промежуточных Path
+        # на каждый элемент (os.path.splitext не годится: "name." он режет на "name" + ".")
+        parent, name = os.path.split(str(p))
+        stem, suffix = _split_name(name)
         if mode == "prefix":
             new_stem = (b or a) + stem
         elif mode == "suffix":
@@ -88,14 +123,12 @@ def build_plan(
         elif mode == "replace":
             new_stem = stem.replace(a, b)
         elif mode == "regex":
-            new_stem = re.sub(a, b, stem)
+            new_stem = pat.sub(b, stem)  # type: ignore[union-attr]
         elif mode == "template":
-            tpl = template or b
-            new_stem = _apply_template(idx, tpl)
+            new_stem = _apply_template(idx, tpl_parts)
         else:
             raise ValueError("Unknown mode")
-        new_name = f"{new_stem}{suffix}"
-        dst = parent / new_name
+        dst = Path(os.path.join(parent, f"{new_stem}{suffix}"))
         out.append(RenamePlanItem(src=p, dst=dst))
         idx += step
 
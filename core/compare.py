@@ -1,10 +1,14 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
+from dataclasses import dataclass, replace
+from functools import partial
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
 import hashlib
+import mmap
 import os
+import stat
 
 
 @dataclass(frozen=True)
@@ -26,86 +30,217 @@ class CompareResult:
     same: List[Tuple[FileInfo, FileInfo]]
 
 
-def _sha256_file(p: Path, chunk: int = 1024 * 1024) -> str:
-    h = hashlib.sha256()
-    with p.open("rb") as f:
+# файлы крупнее этого хэшируем через mmap: ядро подкачивает страницы, копий в Python нет
+_MMAP_THRESHOLD = 64 * 1024 * 1024
+
+
+def _sha256_file(p: Union[str, Path], chunk: int = 1024 * 1024) -> str:
+    with open(p, "rb", buffering=0) as f:
+        if os.fstat(f.fileno()).st_size > _MMAP_THRESHOLD:
+            try:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    if hasattr(mm, "madvise") and hasattr(mmap, "MADV_SEQUENTIAL"):
+                        mm.madvise(mmap.MADV_SEQUENTIAL)
+                    return hashlib.sha256(mm).hexdigest()
+            except (OSError, ValueError):
+                # mmap недоступен для этого файла/ФС — обычное чтение ниже
+                pass
+
+        # Python 3.11+: цикл чтения+хэширования целиком в C
+        if hasattr(hashlib, "file_digest"):
+            return hashlib.file_digest(f, "sha256").hexdigest()
+
+        # fallback: один буфер на весь файл, без новых bytes на каждой итерации
+        h = hashlib.sha256()
+        buf = bytearray(chunk)
+        view = memoryview(buf)
         while True:
-            b = f.read(chunk)
-            if not b:
+            n = f.readinto(buf)
+            if not n:
                 break
-            h.update(b)
-    return h.hexdigest()
+            h.update(view[:n])
+        return h.hexdigest()
+
+
+def _sha256_head(p: Union[str, Path], limit: int) -> str:
+    """sha256 первых limit байт файла (быстрый предварительный отсев)."""
+    buf = bytearray(limit)
+    view = memoryview(buf)
+    got = 0
+    # один read() без буфера вправе вернуть меньше (NFS/FUSE) — дочитываем до limit или EOF,
+    # иначе для файлов не длиннее limit это был бы неверный «полный» хэш
+    with open(p, "rb", buffering=0) as f:
+        while got < limit:
+            n = f.readinto(view[got:])
+            if not n:
+                break
+            got += n
+    return hashlib.sha256(view[:got]).hexdigest()
+
+
+def _io_workers() -> int:
+    # хэширование и обход упираются в I/O, а sha256 в hashlib отпускает GIL — потоков берём с запасом
+    return min(32, (os.cpu_count() or 1) * 4)
+
+
+def _hash_files(paths: List[str], fn: Callable[[str], str] = _sha256_file) -> Dict[str, Optional[str]]:
+    """Параллельно считает хэш fn (по умолчанию sha256 всего файла): path -> hex (None при ошибке)."""
+    out: Dict[str, Optional[str]] = {}
+    if not paths:
+        return out
+
+    with ThreadPoolExecutor(max_workers=_io_workers()) as ex:
+        futures = {ex.submit(fn, p): p for p in paths}
+        for fut in as_completed(futures):
+            try:
+                out[futures[fut]] = fut.result()
+            except Exception:
+                out[futures[fut]] = None
+    return out
+
+
+def _scan_dir(cur: str, cut: int) -> Tuple[List[FileInfo], List[str]]:
+    """Один каталог: FileInfo для всех записей + подкаталоги для дальнейшего обхода."""
+    infos: List[FileInfo] = []
+    subdirs: List[str] = []
+    try:
+        with os.scandir(cur) as it:
+            for e in it:
+                rel = e.path[cut:]
+                # один lstat на запись: тип/размер/mtime берём из одного st, без отдельного is_dir().
+                # Именно DirEntry.stat, а не os.stat: на Windows он вообще без syscall (данные из листинга)
+                try:
+                    st = e.stat(follow_symlinks=False)
+                except OSError:
+                    continue
+                is_dir = stat.S_ISDIR(st.st_mode)
+
+                infos.append(FileInfo(rel=rel, size=int(st.st_size), mtime_ns=int(st.st_mtime_ns), is_dir=is_dir))
+
+                if is_dir:
+                    subdirs.append(e.path)
+    except Exception:
+        pass
+    return infos, subdirs
 
 
-def index_tree(root: Path, use_hash: bool = False, limit: int = 200_000) -> Dict[str, FileInfo]:
+def index_tree(root: Path, limit: int = 200_000) -> List[FileInfo]:
     """
-    Индексирует дерево root в словарь rel_path -> FileInfo.
-    use_hash=True: для файлов считает sha256 (медленнее, но точнее).
+    Индексирует дерево root в список FileInfo, отсортированный по rel.
+    Каталоги сканируются параллельно в пуле потоков, чтобы lstat-ы разных
+    каталогов перекрывались по времени.
+    Хэши здесь не считаются — compare_dirs хэширует только то, что нужно.
     """
     root = root.expanduser().resolve()
-    out: Dict[str, FileInfo] = {}
-
-    # DFS вручную через стек + os.scandir (быстро и контролируемо)
-    stack = [root]
-    while stack and len(out) < limit:
-        cur = stack.pop()
-        try:
-            with os.scandir(cur) as it:
-                for e in it:
-                    rel = str(Path(e.path).resolve().relative_to(root))
-                    try:
-                        is_dir = e.is_dir(follow_symlinks=False)
-                    except OSError:
-                        continue
-
-                    try:
-                        st = e.stat(follow_symlinks=False)
-                        size = int(st.st_size)
-                        mtime_ns = int(st.st_mtime_ns)
-                    except OSError:
-                        size = 0
-                        mtime_ns = 0
-
-                    sha = None
-                    if use_hash and (not is_dir):
-                        try:
-                            sha = _sha256_file(Path(e.path))
-                        except Exception:
-                            sha = None
-
-                    out[rel] = FileInfo(rel=rel, size=size, mtime_ns=mtime_ns, is_dir=is_dir, sha256=sha)
-
-                    if is_dir:
-                        stack.append(Path(e.path))
-        except Exception:
-            continue
+    out: List[FileInfo] = []
+
+    # root уже resolve()-нут, а e.path = cur + sep + name, поэтому rel — просто срез строки
+    root_str = os.path.join(str(root), "")
+    cut = len(root_str)
+
+    with ThreadPoolExecutor(max_workers=_io_workers()) as ex:
+        pending = {ex.submit(_scan_dir, str(root), cut)}
+        while pending and len(out) < limit:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for fut in done:
+                infos, subdirs = fut.result()
+                out.extend(infos)
+                for d in subdirs:
+                    pending.add(ex.submit(_scan_dir, d, cut))
+        for fut in pending:
+            fut.cancel()
 
+    # пачки целых каталогов могли перескочить limit — обрезаем до сортировки, как и прежде не больше limit
+    del out[limit:]
+    # порядок обхода недетерминирован — сортируем один раз, дальше compare_dirs идёт слиянием
+    out.sort(key=lambda fi: fi.rel)
     return out
 
 
-def compare_dirs(left: Path, right: Path, use_hash: bool = False) -> CompareResult:
+def _merge_sorted(
+    left: Iterable[FileInfo], right: Iterable[FileInfo]
+) -> Iterator[Tuple[Optional[FileInfo], Optional[FileInfo]]]:
+    """
+    Потоковое слияние двух отсортированных по rel последовательностей:
+    выдаёт (a, b), (a, None) или (None, b) в порядке rel, без промежуточных множеств.
+    """
+    it_l = iter(left)
+    it_r = iter(right)
+    a = next(it_l, None)
+    b = next(it_r, None)
+    while a is not None and b is not None:
+        if a.rel < b.rel:
+            yield a, None
+            a = next(it_l, None)
+        elif a.rel > b.rel:
+            yield None, b
+            b = next(it_r, None)
+        else:
+            yield a, b
+            a = next(it_l, None)
+            b = next(it_r, None)
+    while a is not None:
+        yield a, None
+        a = next(it_l, None)
+    while b is not None:
+        yield None, b
+        b = next(it_r, None)
+
+
+def compare_dirs(left: Path, right: Path, use_hash: bool = False, head_bytes: int = 0) -> CompareResult:
+    """
+    use_hash=True: файлы одинакового размера дополнительно сверяются по sha256.
+    Файлы разного размера заведомо разные и не хэшируются.
+    head_bytes > 0 (только с use_hash): сначала хэшируются первые head_bytes байт,
+    и полный хэш считается лишь для пар с совпавшим началом (двухступенчато, как rsync).
+    """
     left = left.expanduser().resolve()
     right = right.expanduser().resolve()
 
-    L = index_tree(left, use_hash=use_hash)
-    R = index_tree(right, use_hash=use_hash)
+    L = index_tree(left)
+    R = index_tree(right)
 
     only_left: List[FileInfo] = []
     only_right: List[FileInfo] = []
+    both: List[Tuple[FileInfo, FileInfo]] = []
     different: List[Tuple[FileInfo, FileInfo]] = []
     same: List[Tuple[FileInfo, FileInfo]] = []
 
-    keys = set(L.keys()) | set(R.keys())
-    for k in sorted(keys):
-        a = L.get(k)
-        b = R.get(k)
-        if a is None:
-            only_right.append(b)  # type: ignore
-            continue
+    for a, b in _merge_sorted(L, R):
         if b is None:
-            only_left.append(a)
-            continue
+            only_left.append(a)  # type: ignore
+        elif a is None:
+            only_right.append(b)
+        else:
+            both.append((a, b))
 
+    # хэшируем только пары файлов с совпадающим размером
+    hashes: Dict[str, Optional[str]] = {}
+    if use_hash:
+        todo: List[Tuple[str, str, int]] = []
+        for a, b in both:
+            if not a.is_dir and not b.is_dir and a.size == b.size:
+                todo.append((str(left / a.rel), str(right / b.rel), a.size))
+
+        if head_bytes > 0:
+            heads = _hash_files(
+                [p for pa, pb, _ in todo for p in (pa, pb)],
+                partial(_sha256_head, limit=head_bytes),
+            )
+            full: List[Tuple[str, str, int]] = []
+            for pa, pb, size in todo:
+                if size <= head_bytes:
+                    # файл целиком уместился в «голову» — это и есть полный хэш
+                    hashes[pa] = heads.get(pa)
+                    hashes[pb] = heads.get(pb)
+                elif heads.get(pa) and heads.get(pa) == heads.get(pb):
+                    full.append((pa, pb, size))
+                # начало различается — пара разная, полный хэш не нужен
+            todo = full
+
+        hashes.update(_hash_files([p for pa, pb, _ in todo for p in (pa, pb)]))
+
+    for a, b in both:
         # оба существуют
         if a.is_dir != b.is_dir:
             different.append((a, b))
@@ -115,9 +250,14 @@ def compare_dirs(left: Path, right: Path, use_hash: bool = False) -> CompareResu
             same.append((a, b))
             continue
 
-        # файлы: сравниваем по size+mtime, при use_hash — ещё и hash
+        # файлы: сравниваем по size+mtime, при use_hash — size+hash
         if use_hash:
-            if a.size == b.size and a.sha256 and b.sha256 and a.sha256 == b.sha256:
+            if a.size != b.size:
+                different.append((a, b))
+                continue
+            a = replace(a, sha256=hashes.get(str(left / a.rel)))
+            b = replace(b, sha256=hashes.get(str(right / b.rel)))
+            if a.sha256 and b.sha256 and a.sha256 == b.sha256:
                 same.append((a, b))
             else:
                 different.append((a, b))
@@ -1,46 +1,98 @@
 from __future__ import annotations
 
+import functools
 import json
+import os
+import time
 from pathlib import Path
-from typing import Set
+from typing import Iterable, Optional, Set, Union
 
 # где храним “внутреннюю блокировку”
 _DB_DIR = Path.home() / ".file_manager"
 _DB_PATH = _DB_DIR / "locks.json"
 
+# кэш содержимого locks.json; перечитываем только если файл изменился (по mtime)
+_cache: Optional[Set[str]] = None
+_cache_mtime: int = 0
+# locks.json не перепроверяем чаще, чем раз в _RECHECK_S: серия is_locked (удаление 100 файлов,
+# Ctrl+X/Ctrl+V подряд) обходится без stat на каждый вызов
+_RECHECK_S = 0.25
+_cache_checked: float = float("-inf")
 
-def _norm(p: Path) -> str:
-    return str(p.expanduser().resolve())
 
+@functools.lru_cache(maxsize=4096)
+def _norm(p_str: str) -> str:
+    # resolve() ходит по всем компонентам пути (readlink/stat) — кэшируем по строке
+    return str(Path(p_str).expanduser().resolve())
+
+
+def clear_path_cache() -> None:
+    """Сбросить кэш нормализованных путей (после переименований/перемещений)."""
+    _norm.cache_clear()
+
+
+def _load_set(recheck: bool = False) -> Set[str]:
+    """Набор заблокированных путей. Возвращает кэш — не изменять на месте."""
+    global _cache, _cache_mtime, _cache_checked
+    now = time.monotonic()
+    if _cache is not None and not recheck and now - _cache_checked < _RECHECK_S:
+        return _cache
+
+    try:
+        mtime = _DB_PATH.stat().st_mtime_ns
+    except OSError:
+        # файла ещё нет — блокировок нет
+        _cache, _cache_mtime, _cache_checked = set(), 0, now
+        return _cache
+
+    if _cache is not None and mtime == _cache_mtime:
+        _cache_checked = now
+        return _cache
 
-def _load_set() -> Set[str]:
     try:
-        if not _DB_PATH.exists():
-            return set()
         data = json.loads(_DB_PATH.read_text(encoding="utf-8"))
         items = data.get("locked", [])
-        return set(str(x) for x in items)
+        s = set(str(x) for x in items)
     except Exception:
         return set()
 
+    _cache = s
+    _cache_mtime = mtime
+    _cache_checked = now
+    return s
+
 
 def _save_set(s: Set[str]) -> None:
+    global _cache, _cache_mtime, _cache_checked
     _DB_DIR.mkdir(parents=True, exist_ok=True)
-    data = {"locked": sorted(s)}
-    _DB_PATH.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
+    # порядок не важен, поэтому без sorted()/indent; пишем во временный файл и подменяем атомарно
+    data = {"locked": list(s)}
+    tmp = _DB_PATH.with_suffix(".json.tmp")
+    tmp.write_bytes(json.dumps(data, ensure_ascii=False).encode("utf-8"))
+    os.replace(tmp, _DB_PATH)
+
+    _cache = s
+    _cache_mtime = _DB_PATH.stat().st_mtime_ns
+    _cache_checked = time.monotonic()
 
 
-def is_locked(p: Path) -> bool:
+def is_locked(p: Union[str, Path]) -> bool:
     """True если путь помечен как заблокированный (внутри менеджера)."""
-    return _norm(p) in _load_set()
+    return _norm(str(p)) in _load_set()
 
 
 def set_locked(p: Path, locked: bool) -> None:
     """Установить/снять внутреннюю блокировку."""
-    s = _load_set()
-    key = _norm(p)
+    set_locked_many([p], locked)
+
+
+def set_locked_many(paths: Iterable[Path], locked: bool) -> None:
+    """Установить/снять блокировку сразу для нескольких путей (одна запись на диск)."""
+    # перед записью — всегда свежая версия с диска, без окна _RECHECK_S
+    s = set(_load_set(recheck=True))
+    keys = [_norm(str(p)) for p in paths]
     if locked:
-        s.add(key)
+        s.update(keys)
     else:
-        s.discard(key)
+        s.difference_update(keys)
     _save_set(s)
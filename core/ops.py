@@ -1,9 +1,131 @@
+import errno
 import logging
+import os
 import shutil
+import stat
+import sys
 from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Tuple, Union
+
+__all__ = [
+    "remove_any",
+    "bulk_remove",
+    "bulk_rename",
+    "copy_any",
+    "move_any",
+    "create_file",
+    "unique_path",
+    "merge_copy_dir",
+    "merge_copy_dir_iter",
+    "merge_move_dir",
+    "same_device",
+    "unique_file_path",
+    "unique_dir_path",
+]
 
 logger = logging.getLogger(__name__)
 
+_COPY_CHUNK = 1 << 30
+
+# sendfile между обычными файлами с offset=None — только Linux (на macOS/BSD — TypeError/ENOTSOCK)
+_HAVE_SENDFILE_FILES = hasattr(os, "sendfile") and sys.platform.startswith("linux")
+
+# "этот способ здесь не поддерживается" — только на них переходим к следующему
+_FALLBACK_ERRNOS = frozenset(
+    getattr(errno, name)
+    for name in ("ENOSYS", "EXDEV", "EINVAL", "EOPNOTSUPP", "ENOTSUP", "ETXTBSY")
+    if hasattr(errno, name)
+)
+
+
+def _copy_file_range_loop(in_fd: int, out_fd: int) -> None:
+    while os.copy_file_range(in_fd, out_fd, _COPY_CHUNK):
+        pass
+
+
+def _sendfile_loop(in_fd: int, out_fd: int) -> None:
+    while os.sendfile(out_fd, in_fd, None, _COPY_CHUNK):
+        pass
+
+
+def _copy_data(fsrc, fdst) -> None:
+    """Перенос содержимого между открытыми файлами: copy_file_range → sendfile → read/write."""
+    in_fd = fsrc.fileno()
+    out_fd = fdst.fileno()
+
+    strategies = []
+    if hasattr(os, "copy_file_range"):
+        strategies.append(_copy_file_range_loop)
+    if _HAVE_SENDFILE_FILES:
+        strategies.append(_sendfile_loop)
+
+    for copy in strategies:
+        try:
+            copy(in_fd, out_fd)
+            return
+        except OSError as e:
+            # ENOSPC/EIO/EDQUOT и т.п. — настоящая ошибка, повтор другим способом не поможет
+            if e.errno not in _FALLBACK_ERRNOS:
+                raise
+            # ФС/ядро не поддерживает — начинаем заново следующим способом
+            os.lseek(in_fd, 0, os.SEEK_SET)
+            os.lseek(out_fd, 0, os.SEEK_SET)
+            os.ftruncate(out_fd, 0)
+
+    shutil.copyfileobj(fsrc, fdst)
+
+
+def _fast_copy(src, dst) -> None:
+    """
+    Копирование содержимого файла средствами ядра (как shutil.copy2, но быстрее):
+    os.copy_file_range (reflink/серверное копирование на Btrfs/XFS/NFS/CIFS),
+    затем os.sendfile, затем обычный цикл read/write. Метаданные — через copystat.
+    Те же проверки, что в shutil.copyfile: один и тот же файл и именованные каналы.
+    """
+    if os.path.exists(dst) and os.path.samefile(src, dst):
+        # open(dst, "wb") обрезал бы и src (жёсткая ссылка, bind-mount, регистронезависимая ФС)
+        raise shutil.SameFileError(f"{src!r} and {dst!r} are the same file")
+    for fn in (src, dst):
+        try:
+            st = os.stat(fn)
+        except OSError:
+            continue
+        if stat.S_ISFIFO(st.st_mode):
+            raise shutil.SpecialFileError(f"`{fn}` is a named pipe")
+
+    with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+        _copy_data(fsrc, fdst)
+
+    shutil.copystat(src, dst)
+
+
+def _copy_at(src_dir_fd: int, name: str, dst_dir_fd: int, dst_name: str) -> None:
+    """Как _fast_copy, но имена относительно открытых каталогов (openat) — без разбора полного пути."""
+    # open() на FIFO заблокировался бы — проверяем оба конца до открытия
+    if stat.S_ISFIFO(os.stat(name, dir_fd=src_dir_fd).st_mode):
+        raise shutil.SpecialFileError(f"`{name}` is a named pipe")
+    try:
+        if stat.S_ISFIFO(os.stat(dst_name, dir_fd=dst_dir_fd).st_mode):
+            raise shutil.SpecialFileError(f"`{dst_name}` is a named pipe")
+    except FileNotFoundError:
+        pass
+    with open(os.open(name, os.O_RDONLY, dir_fd=src_dir_fd), "rb") as fsrc:
+        # без O_TRUNC: сначала убеждаемся, что приёмник — не тот же файл
+        out_fd = os.open(dst_name, os.O_WRONLY | os.O_CREAT, 0o666, dir_fd=dst_dir_fd)
+        with open(out_fd, "wb") as fdst:
+            st_src = os.fstat(fsrc.fileno())
+            st_dst = os.fstat(out_fd)
+            if (st_src.st_dev, st_src.st_ino) == (st_dst.st_dev, st_dst.st_ino):
+                raise shutil.SameFileError(f"{name!r} and {dst_name!r} are the same file")
+            os.ftruncate(out_fd, 0)
+            _copy_data(fsrc, fdst)
+            fdst.flush()
+            shutil.copystat(fsrc.fileno(), out_fd)
+
+
+# fwalk + *at-вызовы есть только на POSIX; иначе — обход через os.scandir
+_HAVE_FWALK = hasattr(os, "fwalk") and {os.open, os.stat} <= os.supports_dir_fd
+
 
 def remove_any(path: Path) -> None:
     """Удалить файл или папку рекурсивно."""
@@ -14,18 +136,125 @@ def remove_any(path: Path) -> None:
         path.unlink()
 
 
+# unlink/rename относительно дескриптора каталога (unlinkat/renameat) — POSIX
+_HAVE_DIR_FD_OPS = {os.open, os.unlink, os.rename} <= os.supports_dir_fd
+
+
+def _open_dir(path: str) -> int:
+    return os.open(path, os.O_RDONLY | getattr(os, "O_DIRECTORY", 0))
+
+
+def _group_by_parent(paths: Iterable[Union[str, Path]]) -> Dict[str, List[Union[str, Path]]]:
+    # порядок внутри каталога сохраняется
+    groups: Dict[str, List[Union[str, Path]]] = {}
+    for p in paths:
+        groups.setdefault(os.path.dirname(str(p)), []).append(p)
+    return groups
+
+
+def bulk_remove(paths: Iterable[Union[str, Path]]) -> List[Tuple[Union[str, Path], OSError]]:
+    """
+    Удалить несколько объектов за один проход; ошибка по одному не прерывает остальные.
+    Файлы и ссылки — сразу unlink без предварительного stat (по дескриптору родителя),
+    папки — shutil.rmtree. Возвращает список (путь, ошибка).
+    """
+    errors: List[Tuple[Union[str, Path], OSError]] = []
+    for parent, items in _group_by_parent(paths).items():
+        dir_fd = None
+        if _HAVE_DIR_FD_OPS:
+            try:
+                dir_fd = _open_dir(parent)
+            except OSError:
+                pass
+        try:
+            for p in items:
+                logger.info("DELETE | %s", p)
+                try:
+                    try:
+                        if dir_fd is not None:
+                            os.unlink(os.path.basename(str(p)), dir_fd=dir_fd)
+                        else:
+                            os.unlink(p)
+                    except (IsADirectoryError, PermissionError):
+                        # каталог (EISDIR на Linux, EPERM/EACCES на macOS/Windows)
+                        if os.path.isdir(p) and not os.path.islink(p):
+                            shutil.rmtree(p)
+                        else:
+                            raise
+                except OSError as e:
+                    errors.append((p, e))
+        finally:
+            if dir_fd is not None:
+                os.close(dir_fd)
+    return errors
+
+
+def bulk_rename(pairs: Iterable[Tuple[Path, Path]]) -> List[Tuple[Path, OSError]]:
+    """
+    Переименовать пары (src, dst); в пределах одного каталога — renameat по одному
+    дескриптору. Ошибка по одной паре не прерывает остальные. Возвращает (src, ошибка).
+    """
+    errors: List[Tuple[Path, OSError]] = []
+    pairs = list(pairs)
+    groups = _group_by_parent(src for src, _ in pairs)
+    dst_of = {str(src): dst for src, dst in pairs}
+
+    for parent, items in groups.items():
+        dir_fd = None
+        if _HAVE_DIR_FD_OPS:
+            try:
+                dir_fd = _open_dir(parent)
+            except OSError:
+                pass
+        try:
+            for src in items:
+                dst = dst_of[str(src)]
+                logger.info("RENAME | %s -> %s", src, dst)
+                try:
+                    if dir_fd is not None and os.path.dirname(str(dst)) == parent:
+                        os.rename(
+                            os.path.basename(str(src)),
+                            os.path.basename(str(dst)),
+                            src_dir_fd=dir_fd,
+                            dst_dir_fd=dir_fd,
+                        )
+                    else:
+                        os.rename(src, dst)
+                except OSError as e:
+                    errors.append((src, e))
+        finally:
+            if dir_fd is not None:
+                os.close(dir_fd)
+    return errors
+
+
 def copy_any(src: Path, dst: Path) -> None:
     """Скопировать файл или папку."""
     logger.info("COPY | %s -> %s", src, dst)
     if src.is_dir():
-        shutil.copytree(str(src), str(dst))
+        shutil.copytree(str(src), str(dst), copy_function=_fast_copy)
     else:
-        shutil.copy2(str(src), str(dst))
+        _fast_copy(str(src), str(dst))
+
+
+def same_device(a: Path, b: Path) -> bool:
+    """True если a и b на одном разделе (перемещение = один rename, без копирования данных)."""
+    try:
+        return os.lstat(a).st_dev == os.stat(b).st_dev
+    except OSError:
+        return False
 
 
 def move_any(src: Path, dst: Path) -> None:
     """Переместить файл или папку."""
     logger.info("MOVE | %s -> %s", src, dst)
+    # тот же раздел и цели нет — атомарный rename; иначе shutil.move (копирование + удаление)
+    if not os.path.lexists(dst) and same_device(src, dst.parent):
+        try:
+            os.replace(src, dst)
+            return
+        except OSError:
+            pass
     shutil.move(str(src), str(dst))
 
 
@@ -41,6 +270,35 @@ def create_file(path: Path, content: str = "") -> None:
         f.write(content)
 
 
+def _first_free(make: Callable[[int], Path]) -> Path:
+    """
+    Ищет свободный кандидат make(i), i >= 1, за O(log N) проверок exists():
+    удваиваем i до первого свободного, затем бинарный поиск между занятым i/2 и свободным i.
+    При «дырах» в нумерации может вернуть не самый маленький номер, но всегда свободный.
+    """
+    cand = make(1)
+    if not cand.exists():
+        return cand
+
+    lo, hi = 1, 2  # make(lo) занят
+    while True:
+        cand = make(hi)
+        if not cand.exists():
+            break
+        lo, hi = hi, hi * 2
+
+    free = cand
+    while hi - lo > 1:
+        mid = (lo + hi) // 2
+        cand = make(mid)
+        if cand.exists():
+            lo = mid
+        else:
+            hi = mid
+            free = cand
+    return free
+
+
 def unique_path(path: Path) -> Path:
     """
     Возвращает уникальный путь, добавляя ' (n)' перед расширением (для файлов)
@@ -54,22 +312,12 @@ def unique_path(path: Path) -> Path:
     # Папки (или что-то без расширения), нумеруем по имени
     if path.exists() and path.is_dir():
         base = path.name
-        i = 1
-        while True:
-            cand = parent / f"{base} ({i})"
-            if not cand.exists():
-                return cand
-            i += 1
+        return _first_free(lambda i: parent / f"{base} ({i})")
 
     # Файлы: stem (n).suffix
     stem = path.stem
     suffix = path.suffix
-    i = 1
-    while True:
-        cand = parent / f"{stem} ({i}){suffix}"
-        if not cand.exists():
-            return cand
-        i += 1
+    return _first_free(lambda i: parent / f"{stem} ({i}){suffix}")
 
 
 def merge_copy_dir(src_dir: Path, dst_dir: Path) -> None:
@@ -81,6 +329,15 @@ def merge_copy_dir(src_dir: Path, dst_dir: Path) -> None:
     - Файлы с одинаковыми именами сохраняются оба: добавляется номер (keep both).
     - В src_dir ничего не создаётся и не изменяется.
     """
+    for _ in merge_copy_dir_iter(src_dir, dst_dir):
+        pass
+
+
+def merge_copy_dir_iter(src_dir: Path, dst_dir: Path) -> Iterator[str]:
+    """
+    То же, что merge_copy_dir, но по шагам: отдаёт путь каждого скопированного файла.
+    Для прогресса и отмены — достаточно перестать итерировать (или вызвать close()).
+    """
     src_dir = src_dir.expanduser().resolve()
     dst_dir = dst_dir.expanduser().resolve()
 
@@ -90,24 +347,137 @@ def merge_copy_dir(src_dir: Path, dst_dir: Path) -> None:
     # создаём dst_dir при необходимости
     dst_dir.mkdir(parents=True, exist_ok=True)
 
-    for src_item in src_dir.iterdir():
-        dst_item = dst_dir / src_item.name
+    if _HAVE_FWALK:
+        yield from _merge_copy_fwalk(str(src_dir), str(dst_dir))
+        return
+
+    # обход явным стеком пар (src, dst) + os.scandir: без рекурсии и без Path на каждый элемент
+    stack: List[Tuple[str, str]] = [(str(src_dir), str(dst_dir))]
+    while stack:
+        cur_src, cur_dst = stack.pop()
+
+        with os.scandir(cur_src) as it:
+            for e in it:
+                dst_item = os.path.join(cur_dst, e.name)
+
+                if e.is_dir():
+                    # если в назначении файл с таким именем — создаём новую папку с номером
+                    if os.path.isfile(dst_item):
+                        dst_item = str(unique_dir_path(Path(dst_item)))
+
+                    # папку создаём сразу, чтобы её имя уже было занято для соседних файлов
+                    os.makedirs(dst_item, exist_ok=True)
+                    stack.append((e.path, dst_item))
+
+                else:
+                    # e — файл
+                    if os.path.exists(dst_item):
+                        # если в назначении папка с таким именем или файл — keep both
+                        dst_item = str(unique_file_path(Path(dst_item)))
+
+                    _fast_copy(e.path, dst_item)
+                    yield dst_item
+
+
+def _reraise(err: OSError) -> None:
+    raise err
+
+
+def _merge_copy_fwalk(src_dir: str, dst_dir: str) -> Iterator[str]:
+    """merge_copy_dir_iter через os.fwalk: файлы открываются относительно дескрипторов каталогов."""
+    # каталог источника -> каталог назначения (с учётом переименований keep both)
+    targets = {src_dir: dst_dir}
+
+    # follow_symlinks=True — ссылки на папки раскрываются, как e.is_dir() в обходе через scandir;
+    # onerror: нечитаемый каталог — ошибка, как у scandir-обхода (иначе fwalk молча его пропустит,
+    # а перенос между разделами после "успеха" удалит источник)
+    for cur_src, dirs, files, src_fd in os.fwalk(src_dir, follow_symlinks=True, onerror=_reraise):
+        cur_dst = targets.pop(cur_src)
 
-        if src_item.is_dir():
+        for name in dirs:
+            dst_item = os.path.join(cur_dst, name)
             # если в назначении файл с таким именем — создаём новую папку с номером
-            if dst_item.exists() and dst_item.is_file():
-                dst_item = unique_dir_path(dst_item)
+            if os.path.isfile(dst_item):
+                dst_item = str(unique_dir_path(Path(dst_item)))
 
-            # рекурсивный merge
-            merge_copy_dir(src_item, dst_item)
+            # папку создаём сразу, чтобы её имя уже было занято для соседних файлов
+            os.makedirs(dst_item, exist_ok=True)
+            targets[os.path.join(cur_src, name)] = dst_item
 
-        else:
-            # src_item — файл
-            if dst_item.exists():
-                # если в назначении папка с таким именем или файл — keep both
-                dst_item = unique_file_path(dst_item)
+        if not files:
+            continue
+
+        dst_fd = os.open(cur_dst, os.O_RDONLY | getattr(os, "O_DIRECTORY", 0))
+        try:
+            for name in files:
+                dst_name = name
+                try:
+                    os.stat(name, dir_fd=dst_fd)
+                except FileNotFoundError:
+                    pass
+                else:
+                    # если в назначении папка с таким именем или файл — keep both
+                    dst_name = unique_file_path(Path(cur_dst, name)).name
+
+                _copy_at(src_fd, name, dst_fd, dst_name)
+                yield os.path.join(cur_dst, dst_name)
+        finally:
+            os.close(dst_fd)
+
+
+def merge_move_dir(src_dir: Path, dst_dir: Path) -> None:
+    """
+    Слияние с перемещением в пределах одного раздела: те же правила, что у merge_copy_dir,
+    но вместо копирования — rename. Подпапки, которых нет в назначении, переезжают целиком
+    одним rename (через границу монтирования — копированием). Опустевшие папки src_dir
+    в конце удаляются; непустая остаётся и даёт OSError.
+    """
+    src_dir = src_dir.expanduser().resolve()
+    dst_dir = dst_dir.expanduser().resolve()
+
+    if not src_dir.exists() or not src_dir.is_dir():
+        raise ValueError(f"merge_move_dir: src_dir is not a directory: {src_dir}")
 
-            shutil.copy2(src_item, dst_item)
+    dst_dir.mkdir(parents=True, exist_ok=True)
+
+    # каталоги источника, которые сливались по содержимому: в конце удаляются снизу вверх
+    merged: List[str] = []
+    stack: List[Tuple[str, str]] = [(str(src_dir), str(dst_dir))]
+    while stack:
+        cur_src, cur_dst = stack.pop()
+        merged.append(cur_src)
+
+        with os.scandir(cur_src) as it:
+            entries = list(it)
+
+        for e in entries:
+            dst_item = os.path.join(cur_dst, e.name)
+
+            if e.is_dir(follow_symlinks=False):
+                if os.path.isdir(dst_item):
+                    # такая папка уже есть — сливаем содержимое
+                    stack.append((e.path, dst_item))
+                    continue
+                if os.path.lexists(dst_item):
+                    # в назначении файл с таким именем — папка переедет под номером
+                    dst_item = str(unique_dir_path(Path(dst_item)))
+            else:
+                if os.path.lexists(dst_item):
+                    # keep both
+                    dst_item = str(unique_file_path(Path(dst_item)))
+
+            try:
+                os.rename(e.path, dst_item)
+            except OSError as err:
+                if err.errno != errno.EXDEV:
+                    raise
+                # внутри src точка монтирования — этот объект копируем и удаляем
+                shutil.move(e.path, dst_item)
+
+    # всё содержимое переехало; os.rmdir, а не rmtree: если что-то осталось
+    # (появилось во время переноса), это ошибка, а не молчаливое удаление
+    for d in reversed(merged):
+        os.rmdir(d)
 
 
 def unique_file_path(dst: Path) -> Path:
@@ -119,12 +489,7 @@ def unique_file_path(dst: Path) -> Path:
     stem = dst.stem
     suffix = dst.suffix  # '.txt'
 
-    i = 1
-    while True:
-        cand = parent / f"{stem} ({i}){suffix}"
-        if not cand.exists():
-            return cand
-        i += 1
+    return _first_free(lambda i: parent / f"{stem} ({i}){suffix}")
 
 
 def unique_dir_path(dst: Path) -> Path:
@@ -134,9 +499,4 @@ def unique_dir_path(dst: Path) -> Path:
     parent = dst.parent
     base = dst.name
 
-    i = 1
-    while True:
-        cand = parent / f"{base} ({i})"
-        if not cand.exists():
-            return cand
-        i += 1
+    return _first_free(lambda i: parent / f"{base} ({i})")
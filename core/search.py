@@ -1,18 +1,79 @@
 import os
+import queue
+import threading
+from collections import OrderedDict
 from pathlib import Path
-from typing import List
+from typing import Callable, List, Optional, Tuple
 
+# результаты завершённых поисков: (root, запрос, recursive, limit) -> пути; LRU
+_RESULT_CACHE_SIZE = 32
+_result_cache: "OrderedDict[Tuple[str, str, bool, int], Tuple[str, ...]]" = OrderedDict()
+_result_lock = threading.Lock()
 
-def search_paths(root: Path, query: str, recursive: bool = True, limit: int = 5000) -> List[Path]:
+
+def clear_search_cache() -> None:
+    """Сбросить кэш результатов (после операций с файлами и при ручном обновлении)."""
+    with _result_lock:
+        _result_cache.clear()
+
+
+def _scan_dir(cur_dir: str, q: str, recursive: bool, fold: bool = True) -> Tuple[List[str], List[str]]:
+    """
+    Один каталог: совпадения по имени + подкаталоги для углубления (как строки путей).
+    q уже в нижнем регистре; fold=False — в q нет букв, имя можно не переводить в lower().
+    Ошибки доступа/ФС глотаются — каталог просто пропускается.
+    """
+    matches: List[str] = []
+    subdirs: List[str] = []
+
+    try:
+        with os.scandir(cur_dir) as it:
+            for entry in it:
+                # совпадение по подстроке; str.lower() здесь быстрее варианта с bytes
+                # и, в отличие от bytes.lower(), понимает кириллицу
+                name = entry.name
+                if q in (name.lower() if fold else name):
+                    matches.append(entry.path)
+
+                # углубление
+                if recursive:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            subdirs.append(entry.path)
+                    except OSError:
+                        # нет прав/битый entry/ошибка ФС
+                        pass
+
+    except (PermissionError, FileNotFoundError, NotADirectoryError, OSError):
+        # нет доступа, каталог удалили, или другая ошибка
+        pass
+
+    return matches, subdirs
+
+
+def search_paths(
+    root: Path,
+    query: str,
+    recursive: bool = True,
+    limit: int = 5000,
+    cancel: Optional[threading.Event] = None,
+    on_batch: Optional[Callable[[List[str]], None]] = None,
+) -> List[Path]:
     """
     Самостоятельная реализация поиска по подстроке имени (case-insensitive).
     - обход файловой системы через os.scandir()
-    - DFS (стек каталогов)
+    - каталоги разбирают несколько потоков из общей очереди (листинг — в основном ожидание ФС)
     - обработка PermissionError/OSError
-    - limit для защиты от слишком долгого поиска
+    - limit для защиты от слишком долгого поиска (останавливает все потоки)
     - follow_symlinks=False, чтобы не попадать в циклы
+    - cancel: внешний флаг остановки (например, из UI)
+    - on_batch: вызывается с совпадениями очередного каталога (строки путей) по мере
+      нахождения; вызовы последовательные, но из рабочих потоков; исключение из него
+      останавливает обход и поднимается из search_paths
+    - результат завершённого (не отменённого) поиска кэшируется до clear_search_cache();
+      повтор того же запроса отдаёт его одной пачкой без обхода
 
-    Возвращает список найденных Path.
+    Возвращает список найденных Path (порядок не гарантируется).
     """
     # 1) Нормализуем запрос
     if not isinstance(query, str):
@@ -22,48 +83,109 @@ def search_paths(root: Path, query: str, recursive: bool = True, limit: int = 50
     if not q:
         return []
 
+    # lower() имени ASCII-небуквы не создаёт: для запросов вроде "2024" или "_01." он не нужен
+    fold = not q.isascii() or any(c.isalpha() for c in q)
+
     # 2) Нормализуем root
     root = root.expanduser().resolve()
     if not root.exists() or not root.is_dir():
         return []
 
-    results: List[Path] = []
+    key = (str(root), q, recursive, limit)
+    with _result_lock:
+        hit = _result_cache.get(key)
+        if hit is not None:
+            _result_cache.move_to_end(key)
+    if hit is not None:
+        if on_batch is not None and hit:
+            on_batch(list(hit))
+        return [Path(x) for x in hit]
 
-    # 3) DFS стек: если recursive=False — просто обрабатываем root без углубления
-    stack: List[Path] = [root]
+    # 3) recursive=False — только root, потоки не нужны
+    if not recursive:
+        matches, _ = _scan_dir(str(root), q, recursive=False, fold=fold)
+        matches = matches[:limit]
+        if on_batch is not None and matches:
+            on_batch(matches)
+        if cancel is None or not cancel.is_set():
+            _remember(key, matches)
+        return [Path(x) for x in matches]
 
-    while stack and len(results) < limit:
-        cur_dir = stack.pop()
+    # 4) пул потоков над общим стеком каталогов (LIFO сохраняет порядок, близкий к DFS)
+    results: List[str] = []
+    lock = threading.Lock()
+    # on_batch вызывается вне lock, но по-прежнему строго по одному
+    batch_lock = threading.Lock()
+    stop = threading.Event()
+    # первая ошибка из on_batch: обход останавливается, ошибка поднимается после join
+    errors: List[BaseException] = []
+    # обход прерван отменой — часть каталогов пропущена
+    aborted = threading.Event()
+    dirs: "queue.LifoQueue[Optional[str]]" = queue.LifoQueue()
+    dirs.put(str(root))
 
-        try:
-            with os.scandir(cur_dir) as it:
-                for entry in it:
+    def worker() -> None:
+        while True:
+            cur_dir = dirs.get()
+            if cur_dir is None:
+                dirs.task_done()
+                return
+            try:
+                if cancel is not None and cancel.is_set():
+                    aborted.set()
+                    stop.set()
+                if stop.is_set():
+                    continue
+                matches, subdirs = _scan_dir(cur_dir, q, recursive=True, fold=fold)
+                with lock:
+                    if matches:
+                        matches = matches[: limit - len(results)]
+                        results.extend(matches)
                     if len(results) >= limit:
-                        break
-
-                    # имя
+                        stop.set()
+                if on_batch is not None and matches:
                     try:
-                        name = entry.name.lower()
-                    except Exception:
-                        continue
-
-                    # совпадение по подстроке
-                    if q in name:
-                        results.append(Path(entry.path))
-                        if len(results) >= limit:
-                            break
-
-                    # углубление
-                    if recursive:
-                        try:
-                            if entry.is_dir(follow_symlinks=False):
-                                stack.append(Path(entry.path))
-                        except OSError:
-                            # нет прав/битый entry/ошибка ФС
-                            pass
-
-        except (PermissionError, FileNotFoundError, NotADirectoryError, OSError):
-            # нет доступа, каталог удалили, или другая ошибка
-            continue
-
-    return results
+                        with batch_lock:
+                            on_batch(matches)
+                    except BaseException as e:
+                        # поток не должен умереть: иначе очередь некому дочитать и join() зависнет
+                        with lock:
+                            errors.append(e)
+                        stop.set()
+                if not stop.is_set():
+                    for d in subdirs:
+                        dirs.put(d)
+            finally:
+                dirs.task_done()
+
+    threads = [
+        threading.Thread(target=worker, daemon=True)
+        for _ in range(min(8, os.cpu_count() or 1))
+    ]
+    for t in threads:
+        t.start()
+
+    # join() вернётся, когда все поставленные каталоги обработаны (или пропущены после stop)
+    dirs.join()
+    for _ in threads:
+        dirs.put(None)
+    for t in threads:
+        t.join()
+
+    if errors:
+        raise errors[0]
+
+    # кэшируем только доведённый до конца обход (или остановленный по limit)
+    if not aborted.is_set():
+        _remember(key, results[:limit])
+    # Path создаём только на границе API
+    return [Path(x) for x in results[:limit]]
+
+
+def _remember(key: Tuple[str, str, bool, int], paths: List[str]) -> None:
+    # вызывается только для полного результата: отменённый или упавший обход сюда не доходит
+    with _result_lock:
+        _result_cache[key] = tuple(paths)
+        _result_cache.move_to_end(key)
+        while len(_result_cache) > _RESULT_CACHE_SIZE:
+            _result_cache.popitem(last=False)
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# тесты запускаются из корня репозитория без установки пакета
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
@@ -0,0 +1,20 @@
+from pathlib import Path
+
+import pytest
+
+from core.batch_rename import _split_name, build_plan
+
+
+@pytest.mark.parametrize("name", [
+    "file.txt", "archive.tar.gz", "name.", "name..", ".bashrc", ".hidden.txt", "noext", "a..b", "..",
+])
+def test_split_name_matches_pathlib(name):
+    p = Path(name)
+    assert _split_name(name) == (p.stem, p.suffix)
+
+
+def test_build_plan_name_ending_with_dot(tmp_path):
+    src = tmp_path / "name."
+    (plan_item,) = build_plan([src], "suffix", "", "_x", "")
+    # как у Path.stem/suffix: точка остаётся частью имени
+    assert plan_item.dst == tmp_path / "name._x"
@@ -0,0 +1,120 @@
+import hashlib
+import io
+import os
+
+from core import compare
+from core.compare import compare_dirs, index_tree
+
+
+def _write(root, rel, data, mtime_ns=1_000_000_000_000_000_000):
+    p = root / rel
+    p.parent.mkdir(parents=True, exist_ok=True)
+    p.write_bytes(data)
+    os.utime(p, ns=(mtime_ns, mtime_ns))
+    return p
+
+
+def _rels(infos):
+    return sorted(fi.rel for fi in infos)
+
+
+def test_index_tree_sorted_relative(tmp_path):
+    _write(tmp_path, "b.txt", b"b")
+    _write(tmp_path, "a/c.txt", b"c")
+
+    infos = index_tree(tmp_path)
+
+    assert [fi.rel for fi in infos] == ["a", os.path.join("a", "c.txt"), "b.txt"]
+    assert [fi.is_dir for fi in infos] == [True, False, False]
+
+
+def test_index_tree_respects_limit(tmp_path):
+    for i in range(5):
+        for j in range(5):
+            _write(tmp_path, f"d{i}/f{j}", b"")
+
+    assert len(index_tree(tmp_path, limit=7)) == 7
+
+
+def test_compare_by_size_and_mtime(tmp_path):
+    left, right = tmp_path / "l", tmp_path / "r"
+    _write(left, "same", b"abc")
+    _write(right, "same", b"abc")
+    _write(left, "touched", b"abc")
+    _write(right, "touched", b"abc", mtime_ns=2_000_000_000_000_000_000)
+    _write(left, "only_l", b"")
+    _write(right, "only_r", b"")
+
+    res = compare_dirs(left, right)
+
+    assert _rels(res.only_left) == ["only_l"]
+    assert _rels(res.only_right) == ["only_r"]
+    assert _rels(a for a, _ in res.same) == ["same"]
+    assert _rels(a for a, _ in res.different) == ["touched"]
+
+
+def test_compare_by_hash(tmp_path):
+    left, right = tmp_path / "l", tmp_path / "r"
+    # то же содержимое, другое время — одинаковые
+    _write(left, "copy", b"data")
+    _write(right, "copy", b"data", mtime_ns=2_000_000_000_000_000_000)
+    # тот же размер и время, другое содержимое — разные
+    _write(left, "edit", b"aaaa")
+    _write(right, "edit", b"bbbb")
+
+    res = compare_dirs(left, right, use_hash=True)
+
+    assert _rels(a for a, _ in res.same) == ["copy"]
+    assert _rels(a for a, _ in res.different) == ["edit"]
+
+
+def test_two_tier_hash_skips_full_hash_on_head_mismatch(tmp_path, monkeypatch):
+    left, right = tmp_path / "l", tmp_path / "r"
+    head = b"h" * 16
+    _write(left, "head_differs", b"x" * 16 + b"tail")
+    _write(right, "head_differs", b"y" * 16 + b"tail")
+    _write(left, "tail_differs", head + b"aaaa")
+    _write(right, "tail_differs", head + b"bbbb")
+    _write(left, "small", b"tiny")
+    _write(right, "small", b"tiny")
+
+    full = []
+    real = compare._sha256_file
+
+    def spy(p, *args, **kw):
+        full.append(os.path.basename(p))
+        return real(p, *args, **kw)
+
+    monkeypatch.setattr(compare, "_sha256_file", spy)
+    # _hash_files захватил _sha256_file как значение по умолчанию — подменяем и его
+    monkeypatch.setattr(compare._hash_files, "__defaults__", (spy,))
+
+    res = compare_dirs(left, right, use_hash=True, head_bytes=16)
+
+    assert _rels(a for a, _ in res.same) == ["small"]
+    assert _rels(a for a, _ in res.different) == ["head_differs", "tail_differs"]
+    # полный хэш — только для пары с совпавшим началом; "small" целиком уместился в голову
+    assert sorted(full) == ["tail_differs", "tail_differs"]
+
+
+def test_sha256_head_handles_short_reads(tmp_path, monkeypatch):
+    data = b"0123456789" * 10
+
+    class Trickle(io.RawIOBase):
+        """Отдаёт не больше 7 байт за read — как бывает на NFS/FUSE."""
+
+        def __init__(self):
+            self._src = io.BytesIO(data)
+
+        def readable(self):
+            return True
+
+        def readinto(self, b):
+            chunk = self._src.read(min(7, len(b)))
+            b[:len(chunk)] = chunk
+            return len(chunk)
+
+    monkeypatch.setattr(compare, "open", lambda *a, **kw: Trickle(), raising=False)
+
+    assert compare._sha256_head("ignored", 64) == hashlib.sha256(data[:64]).hexdigest()
+    assert compare._sha256_head("ignored", 1000) == hashlib.sha256(data).hexdigest()
@@ -0,0 +1,169 @@
+import errno
+import os
+
+import pytest
+
+from core import ops
+
+
+def _tree(root, files):
+    for rel, data in files.items():
+        p = root / rel
+        p.parent.mkdir(parents=True, exist_ok=True)
+        p.write_bytes(data)
+
+
+def _read_tree(root):
+    return {
+        str(p.relative_to(root)): p.read_bytes()
+        for p in sorted(root.rglob("*"))
+        if p.is_file()
+    }
+
+
+@pytest.fixture(params=["fwalk", "scandir"])
+def walk_mode(request, monkeypatch):
+    if request.param == "fwalk" and not ops._HAVE_FWALK:
+        pytest.skip("os.fwalk недоступен")
+    monkeypatch.setattr(ops, "_HAVE_FWALK", request.param == "fwalk")
+    return request.param
+
+
+def test_merge_copy_dir_keeps_both(tmp_path, walk_mode):
+    src, dst = tmp_path / "src", tmp_path / "dst"
+    _tree(src, {"a.txt": b"new", "sub/b.txt": b"b", "clash": b"file"})
+    _tree(dst, {"a.txt": b"old", "clash/x": b"x"})
+
+    copied = list(ops.merge_copy_dir_iter(src, dst))
+
+    assert len(copied) == 3
+    assert _read_tree(dst) == {
+        "a.txt": b"old",
+        "a (1).txt": b"new",
+        "sub/b.txt": b"b",
+        "clash/x": b"x",
+        "clash (1)": b"file",
+    }
+
+
+@pytest.mark.skipif(hasattr(os, "geteuid") and os.geteuid() == 0, reason="root читает любой каталог")
+def test_merge_copy_dir_unreadable_subdir_raises(tmp_path, walk_mode):
+    src, dst = tmp_path / "src", tmp_path / "dst"
+    _tree(src, {"a/b/c.txt": b"c"})
+    locked = src / "a" / "b"
+    locked.chmod(0)
+    try:
+        with pytest.raises(PermissionError):
+            ops.merge_copy_dir(src, dst)
+    finally:
+        locked.chmod(0o755)
+
+
+def _failing(err):
+    def copy(in_fd, out_fd):
+        # часть данных уже записана — fallback должен начать с нуля
+        os.write(out_fd, b"garbage")
+        raise OSError(err, os.strerror(err))
+    return copy
+
+
+def test_fast_copy_falls_back_when_unsupported(tmp_path, monkeypatch):
+    src, dst = tmp_path / "src", tmp_path / "dst"
+    src.write_bytes(b"x" * 100_000)
+    monkeypatch.setattr(ops, "_copy_file_range_loop", _failing(errno.EXDEV))
+    monkeypatch.setattr(ops, "_sendfile_loop", _failing(errno.ENOSYS))
+
+    ops._fast_copy(src, dst)
+
+    assert dst.read_bytes() == src.read_bytes()
+
+
+def test_fast_copy_does_not_retry_real_errors(tmp_path, monkeypatch):
+    src, dst = tmp_path / "src", tmp_path / "dst"
+    src.write_bytes(b"data")
+    calls = []
+
+    def no_space(in_fd, out_fd):
+        calls.append(1)
+        raise OSError(errno.ENOSPC, "No space left on device")
+
+    monkeypatch.setattr(ops, "_copy_file_range_loop", no_space)
+    monkeypatch.setattr(ops, "_sendfile_loop", no_space)
+    monkeypatch.setattr(ops.shutil, "copyfileobj", lambda *a: calls.append("read/write"))
+
+    with pytest.raises(OSError) as exc:
+        ops._fast_copy(src, dst)
+    assert exc.value.errno == errno.ENOSPC
+    assert calls == [1]
+
+
+def test_fast_copy_same_file_and_fifo(tmp_path):
+    src = tmp_path / "f"
+    src.write_bytes(b"data")
+    link = tmp_path / "g"
+    os.link(src, link)
+
+    with pytest.raises(ops.shutil.SameFileError):
+        ops._fast_copy(src, link)
+    assert src.read_bytes() == b"data"
+
+    if hasattr(os, "mkfifo"):
+        fifo = tmp_path / "p"
+        os.mkfifo(fifo)
+        with pytest.raises(ops.shutil.SpecialFileError):
+            ops._fast_copy(fifo, tmp_path / "out")
+
+
+def test_merge_move_dir(tmp_path):
+    src, dst = tmp_path / "src", tmp_path / "dst"
+    _tree(src, {"a.txt": b"new", "common/b.txt": b"b", "only/c.txt": b"c"})
+    _tree(dst, {"a.txt": b"old", "common/b.txt": b"old b"})
+
+    ops.merge_move_dir(src, dst)
+
+    assert not src.exists()
+    assert _read_tree(dst) == {
+        "a.txt": b"old",
+        "a (1).txt": b"new",
+        "common/b.txt": b"old b",
+        "common/b (1).txt": b"b",
+        "only/c.txt": b"c",
+    }
+
+
+def test_merge_move_dir_cross_device_entry(tmp_path, monkeypatch):
+    src, dst = tmp_path / "src", tmp_path / "dst"
+    _tree(src, {"mnt/x.txt": b"x", "f.txt": b"f"})
+    dst.mkdir()
+    real_rename = os.rename
+
+    def rename(a, b, *args, **kw):
+        # "mnt" будто на другом разделе
+        if os.path.basename(a) == "mnt":
+            raise OSError(errno.EXDEV, "Invalid cross-device link")
+        return real_rename(a, b, *args, **kw)
+
+    monkeypatch.setattr(os, "rename", rename)
+
+    ops.merge_move_dir(src, dst)
+
+    assert not src.exists()
+    assert _read_tree(dst) == {"mnt/x.txt": b"x", "f.txt": b"f"}
+
+
+def test_merge_move_dir_keeps_leftovers(tmp_path, monkeypatch):
+    src, dst = tmp_path / "src", tmp_path / "dst"
+    _tree(src, {"common/b.txt": b"b"})
+    _tree(dst, {"common/b.txt": b"old"})
+    real_rename = os.rename
+
+    def rename(a, b, *args, **kw):
+        real_rename(a, b, *args, **kw)
+        # файл появился в источнике во время переноса
+        (src / "common" / "late.txt").write_bytes(b"late")
+
+    monkeypatch.setattr(os, "rename", rename)
+
+    with pytest.raises(OSError):
+        ops.merge_move_dir(src, dst)
+    assert (src / "common" / "late.txt").read_bytes() == b"late"
@@ -0,0 +1,61 @@
+import threading
+
+import pytest
+
+from core import search
+from core.search import clear_search_cache, search_paths
+
+
+@pytest.fixture(autouse=True)
+def _fresh_cache():
+    clear_search_cache()
+    yield
+    clear_search_cache()
+
+
+def _tree(root, n=4):
+    for i in range(n):
+        d = root / f"d{i}" / "e"
+        d.mkdir(parents=True)
+        (d / f"x{i}").write_bytes(b"")
+
+
+def test_search_finds_all_case_insensitive(tmp_path):
+    _tree(tmp_path)
+    (tmp_path / "X_upper").write_bytes(b"")
+
+    found = search_paths(tmp_path, "x")
+
+    assert sorted(p.name for p in found) == ["X_upper", "x0", "x1", "x2", "x3"]
+
+
+def test_repeat_search_served_from_cache(tmp_path):
+    _tree(tmp_path)
+    assert len(search_paths(tmp_path, "x")) == 4
+
+    (tmp_path / "x_new").write_bytes(b"")
+    assert len(search_paths(tmp_path, "X ")) == 4  # тот же запрос после нормализации
+
+    clear_search_cache()
+    assert len(search_paths(tmp_path, "x")) == 5
+
+
+def test_on_batch_error_is_raised_and_not_cached(tmp_path):
+    _tree(tmp_path)
+
+    def boom(_):
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        search_paths(tmp_path, "x", on_batch=boom)
+    assert not search._result_cache
+    assert len(search_paths(tmp_path, "x")) == 4
+
+
+def test_cancelled_search_not_cached(tmp_path):
+    _tree(tmp_path)
+    cancel = threading.Event()
+
+    search_paths(tmp_path, "x", cancel=cancel, on_batch=lambda _: cancel.set())
+
+    assert not search._result_cache
@@ -1,10 +1,11 @@
 from __future__ import annotations
 
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional, Tuple
 
-from PySide6.QtCore import Qt
+from PySide6.QtCore import QAbstractTableModel, QModelIndex, QObject, QRunnable, QThreadPool, Qt, Signal
 from PySide6.QtWidgets import (
+    QAbstractItemView,
     QCheckBox,
     QDialog,
     QDialogButtonBox,
@@ -12,14 +13,111 @@ from PySide6.QtWidgets import (
     QLabel,
     QLineEdit,
     QPushButton,
-    QTableWidget,
-    QTableWidgetItem,
+    QTableView,
     QVBoxLayout,
     QFileDialog,
     QMessageBox,
 )
 
-from core.compare import compare_dirs, CompareResult
+from core.compare import compare_dirs, CompareResult, FileInfo
+
+
+# сколько байт с начала файла хэшировать в режиме «быстрого сравнения»
+_FAST_HEAD_BYTES = 64 * 1024
+
+
+# коды статуса строки результата
+_ONLY_LEFT, _ONLY_RIGHT, _DIFFERENT, _SAME = range(4)
+
+_STATUS_TEXT = {
+    _ONLY_LEFT: "Только слева",
+    _ONLY_RIGHT: "Только справа",
+    _DIFFERENT: "Разные",
+    _SAME: "Одинаковые",
+}
+
+
+class CompareResultModel(QAbstractTableModel):
+    """
+    Табличная модель поверх CompareResult: строки — это (код статуса, FileInfo или пара),
+    текст ячеек формируется только в data() для видимых строк.
+    """
+
+    HEADERS = ["Статус", "Относительный путь", "Левая", "Правая"]
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._rows: List[Tuple[int, object]] = []
+
+    def set_result(self, r: CompareResult) -> None:
+        rows: List[Tuple[int, object]] = []
+        rows.extend((_ONLY_LEFT, x) for x in r.only_left)
+        rows.extend((_ONLY_RIGHT, x) for x in r.only_right)
+        rows.extend((_DIFFERENT, p) for p in r.different)
+        rows.extend((_SAME, p) for p in r.same)
+
+        self.beginResetModel()
+        self._rows = rows
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.HEADERS[section]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole or not index.isValid():
+            return None
+
+        code, item = self._rows[index.row()]
+        col = index.column()
+        if col == 0:
+            return _STATUS_TEXT[code]
+
+        if code in (_ONLY_LEFT, _ONLY_RIGHT):
+            fi: FileInfo = item  # type: ignore[assignment]
+            if col == 1:
+                return fi.rel
+            present = (col == 2) == (code == _ONLY_LEFT)
+            return "есть" if present else "нет"
+
+        a, b = item  # type: ignore[misc]
+        if col == 1:
+            return a.rel
+        if code == _SAME:
+            return "="
+        return f"{a.size}B" if col == 2 else f"{b.size}B"
+
+
+class _CompareSignals(QObject):
+    result = Signal(object)  # CompareResult
+    error = Signal(str)
+
+
+class _CompareTask(QRunnable):
+    """compare_dirs в пуле потоков Qt; результат приходит в GUI-поток через сигналы."""
+
+    def __init__(self, left: Path, right: Path, use_hash: bool, head_bytes: int = 0):
+        super().__init__()
+        self.left = left
+        self.right = right
+        self.use_hash = use_hash
+        self.head_bytes = head_bytes
+        self.signals = _CompareSignals()
+
+    def run(self):
+        try:
+            r = compare_dirs(self.left, self.right, use_hash=self.use_hash, head_bytes=self.head_bytes)
+        except Exception as e:
+            self.signals.error.emit(str(e))
+            return
+        self.signals.result.emit(r)
 
 
 class CompareDialog(QDialog):
@@ -31,6 +129,7 @@ class CompareDialog(QDialog):
         self.left_root = left_root
         self.right_root: Optional[Path] = None
         self.result: Optional[CompareResult] = None
+        self._task: Optional[_CompareTask] = None
 
         top = QHBoxLayout()
         self.left_edit = QLineEdit(str(left_root))
@@ -41,26 +140,30 @@ class CompareDialog(QDialog):
         self.right_btn.clicked.connect(self.pick_right)
 
         self.hash_cb = QCheckBox("Сравнивать по SHA-256 (медленно)")
+        self.fast_cb = QCheckBox("Быстрое сравнение (размер+частичный хэш)")
         top.addWidget(QLabel("Левая:"))
         top.addWidget(self.left_edit, 2)
         top.addWidget(QLabel("Правая:"))
         top.addWidget(self.right_edit, 2)
         top.addWidget(self.right_btn)
         top.addWidget(self.hash_cb)
+        top.addWidget(self.fast_cb)
 
-        self.table = QTableWidget(0, 4)
-        self.table.setHorizontalHeaderLabels(["Статус", "Относительный путь", "Левая", "Правая"])
+        self.model = CompareResultModel(self)
+        self.table = QTableView()
+        self.table.setModel(self.model)
         self.table.horizontalHeader().setStretchLastSection(True)
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
 
         btns = QDialogButtonBox(QDialogButtonBox.Close)
         btns.rejected.connect(self.reject)
 
-        run_btn = QPushButton("Сравнить")
-        run_btn.clicked.connect(self.run_compare)
+        self.run_btn = QPushButton("Сравнить")
+        self.run_btn.clicked.connect(self.run_compare)
 
         layout = QVBoxLayout(self)
         layout.addLayout(top)
-        layout.addWidget(run_btn)
+        layout.addWidget(self.run_btn)
         layout.addWidget(self.table, 1)
         layout.addWidget(btns)
 
@@ -75,26 +178,40 @@ class CompareDialog(QDialog):
             QMessageBox.warning(self, "Нет правой папки", "Сначала выберите правую папку.")
             return
 
-        use_hash = self.hash_cb.isChecked()
-        self.result = compare_dirs(self.left_root, self.right_root, use_hash=use_hash)
-        self.fill_table(self.result)
+        if self._task is not None:
+            return  # сравнение уже идёт
+
+        # сравнение (особенно с SHA-256) — в фоне, чтобы диалог не замирал
+        # «быстрое» = SHA-256, но сначала по первым _FAST_HEAD_BYTES байт
+        fast = self.fast_cb.isChecked()
+        task = _CompareTask(
+            self.left_root,
+            self.right_root,
+            use_hash=fast or self.hash_cb.isChecked(),
+            head_bytes=_FAST_HEAD_BYTES if fast else 0,
+        )
+        task.signals.result.connect(self._on_compare_done)
+        task.signals.error.connect(self._on_compare_error)
+        self._task = task
+
+        self.run_btn.setEnabled(False)
+        self.run_btn.setText("Сравнение…")
+        QThreadPool.globalInstance().start(task)
+
+    def _finish_compare(self):
+        self._task = None
+        self.run_btn.setEnabled(True)
+        self.run_btn.setText("Сравнить")
+
+    def _on_compare_done(self, r: CompareResult):
+        self._finish_compare()
+        self.result = r
+        self.fill_table(r)
+
+    def _on_compare_error(self, msg: str):
+        self._finish_compare()
+        QMessageBox.critical(self, "Ошибка", f"Ошибка сравнения: {msg}")
 
     def fill_table(self, r: CompareResult):
-        self.table.setRowCount(0)
-
-        def add_row(status: str, rel: str, l: str, rr: str):
-            row = self.table.rowCount()
-            self.table.insertRow(row)
-            for col, val in enumerate([status, rel, l, rr]):
-                it = QTableWidgetItem(val)
-                it.setFlags(it.flags() ^ Qt.ItemIsEditable)
-                self.table.setItem(row, col, it)
-
-        for x in r.only_left:
-            add_row("Только слева", x.rel, "есть", "нет")
-        for x in r.only_right:
-            add_row("Только справа", x.rel, "нет", "есть")
-        for a, b in r.different:
-            add_row("Разные", a.rel, f"{a.size}B", f"{b.size}B")
-        for a, b in r.same:
-            add_row("Одинаковые", a.rel, "=", "=")
+        # строка модели — кортеж (код, запись); объектов на ячейку нет, текст считается в data()
+        self.model.set_result(r)
@@ -1,15 +1,38 @@
 from __future__ import annotations
 
+import inspect
 import logging
+import os
+import re
+import stat
+import threading
+import time
+from collections import OrderedDict, deque
+from functools import lru_cache, partial
+from itertools import islice
 from pathlib import Path
-from typing import Optional, List
-
-from PySide6.QtCore import QDir, Qt, QModelIndex, QUrl, QEvent
+from typing import Callable, Dict, Iterator, Optional, List, Tuple, Union
+
+from PySide6.QtCore import (
+    QDir,
+    Qt,
+    QModelIndex,
+    QObject,
+    QPersistentModelIndex,
+    QRunnable,
+    QThreadPool,
+    QTimer,
+    QUrl,
+    QEvent,
+    Signal,
+)
 from PySide6.QtGui import QAction, QDesktopServices, QKeySequence
 from PySide6.QtWidgets import (
+    QCompleter,
     QFileSystemModel,
     QHBoxLayout,
     QInputDialog,
+    QLabel,
     QLineEdit,
     QMainWindow,
     QMenu,
@@ -26,31 +49,135 @@ from PySide6.QtWidgets import (
 
 from core.clipboard import Clipboard
 from core.ops import (
+    bulk_remove,
+    bulk_rename,
     copy_any,
     move_any,
     remove_any,
     create_file as core_create_file,
-    merge_copy_dir,
+    merge_copy_dir_iter,
+    merge_move_dir,
+    same_device,
     unique_file_path,
     unique_dir_path,
 )
-from ui.properties_dialog import PropertiesDialog
-from ui.search_dialog import SearchDialog
-from ui.compare_dialog import CompareDialog
-from ui.batch_rename_dialog import BatchRenameDialog
-from ui.attrs_dialog import AttrsDialog
-from core.attrs import apply_attrs
-from core.locks import is_locked
+from core.locks import clear_path_cache, is_locked
+from core.search import clear_search_cache
+
+# диалоги (ui.*_dialog, core.attrs) импортируются в методах при первом открытии — не на старте окна
 
 
 logger = logging.getLogger(__name__)
 
+# как часто (в файлах) длинная операция сообщает о прогрессе
+_PROGRESS_EVERY = 100
+
+# тип события для eventFilter — без поиска атрибута в QEvent на каждое событие
+_FOCUS_IN = QEvent.FocusIn
+
+# сколько каталогов помнить в кэше "число объектов" строки статуса
+_DIR_COUNT_CACHE_SIZE = 64
+# больше не считаем: в статусе показываем "10000+", не дочитывая огромный каталог
+_DIR_COUNT_CAP = 10000
+
+# сколько заблокированных объектов перечислять в сообщении об ошибке удаления
+_LOCKED_SHOWN = 20
+
+# глубина истории back/forward на панель
+_HISTORY_SIZE = 256
+
+# сколько индексов модели помнить на панель (history back/forward и т.п.)
+_INDEX_CACHE_SIZE = 128
+
+# каталоги на сетевых ФС и очень большие (st_size каталога растёт с числом записей; 4 МиБ на ext4 —
+# это порядка 100k+ имён) не отслеживаем QFileSystemWatcher'ом: автообновления там нет, только F5
+_NETWORK_FS = frozenset({
+    "nfs", "nfs4", "cifs", "smb3", "smbfs", "9p", "afs", "ceph", "glusterfs",
+    "fuse.sshfs", "fuse.gcsfuse", "fuse.rclone", "fuse.s3fs",
+})
+_UNWATCHED_DIR_SIZE = 4 * 1024 * 1024
+
+
+# в /proc/self/mounts пробел, таб, перевод строки и обратная косая записаны как \040, \011, \012, \134
+_MOUNT_ESCAPE = re.compile(r"\\([0-7]{3})")
+
+
+@lru_cache(maxsize=1)
+def _mounts() -> Tuple[Tuple[str, str], ...]:
+    """
+    (точка монтирования, тип ФС), длинные точки первыми.
+    Кэшируется до F5 (refresh_panels сбрасывает кэш) — новые монтирования видны после обновления.
+    """
+    try:
+        with open("/proc/self/mounts", encoding="utf-8", errors="replace") as f:
+            rows = [line.split()[1:3] for line in f]
+    except OSError:
+        return ()
+    decoded = ((_MOUNT_ESCAPE.sub(lambda e: chr(int(e[1], 8)), mp), t) for mp, t in rows)
+    return tuple(sorted(decoded, key=lambda r: -len(r[0])))
+
+
+def _should_watch(path: str) -> bool:
+    """Следить ли за каталогом: нет для сетевых ФС и каталогов с огромным числом записей."""
+    for mount, fstype in _mounts():
+        if path == mount or path.startswith(mount.rstrip("/") + "/"):
+            if fstype in _NETWORK_FS:
+                return False
+            break
+    try:
+        return os.stat(path).st_size < _UNWATCHED_DIR_SIZE
+    except OSError:
+        return True
+
+
+class FSMetaCache:
+    """
+    Короткоживущий кэш "есть ли путь / папка ли это" для UI-проверок
+    (контекстное меню, цель вставки, двойной клик): один stat на путь в пределах TTL.
+    После собственных операций менеджер сбрасывает кэш целиком.
+    """
+
+    def __init__(self, ttl: float = 1.0, max_size: int = 4096):
+        self.ttl = ttl
+        self.max_size = max_size
+        # str(path) -> (истекает, st_mode или None если пути нет)
+        self._items: Dict[str, Tuple[float, Optional[int]]] = {}
+
+    def _mode(self, p: Union[str, Path]) -> Optional[int]:
+        key = str(p)
+        now = time.monotonic()
+        hit = self._items.get(key)
+        if hit is not None and hit[0] > now:
+            return hit[1]
+
+        try:
+            mode: Optional[int] = os.stat(key).st_mode
+        except (OSError, ValueError):
+            mode = None
+
+        if len(self._items) >= self.max_size:
+            self._items.clear()
+        self._items[key] = (now + self.ttl, mode)
+        return mode
+
+    def exists(self, p: Union[str, Path]) -> bool:
+        return self._mode(p) is not None
+
+    def is_dir(self, p: Union[str, Path]) -> bool:
+        mode = self._mode(p)
+        return mode is not None and stat.S_ISDIR(mode)
+
+    def invalidate(self) -> None:
+        self._items.clear()
+
 
 class FilePanel:
     def __init__(self):
         self.model = QFileSystemModel()
         self.model.setRootPath(QDir.rootPath())
         self.model.setFilter(QDir.AllEntries | QDir.NoDotAndDotDot)
+        # не читать desktop.ini/.directory в каждой папке ради иконки
+        self.model.setOption(QFileSystemModel.DontUseCustomDirectoryIcons, True)
 
         self.view = QTreeView()
         self.view.setModel(self.model)
@@ -59,12 +186,27 @@ class FilePanel:
         self.view.setSortingEnabled(True)
         self.view.sortByColumn(0, Qt.AscendingOrder)
         self.view.setColumnWidth(0, 380)
+        # все строки одной высоты — view не опрашивает sizeHint каждой строки (важно на 10k+ файлов);
+        # плоский список: в папки заходим двойным кликом, поддеревья не раскрываются
+        self.view.setUniformRowHeights(True)
+        self.view.setItemsExpandable(False)
+        self.view.setRootIsDecorated(False)
 
         self.path_edit = QLineEdit()
+        # автодополнение пути из уже загруженного дерева модели панели, без своих обходов диска;
+        # роль по умолчанию (имя): QCompleter сам режет путь по разделителям и сверяет по уровням
+        self.path_completer = QCompleter(self.model, self.path_edit)
+        self.path_completer.setCompletionMode(QCompleter.PopupCompletion)
+        self.path_completer.setFilterMode(Qt.MatchStartsWith)
+        self.path_edit.setCompleter(self.path_completer)
         self.root: Path = Path.home()
+        # каталог, на который уже настроены корень модели и root index view
+        self.shown_path: Optional[str] = None
+        # False — каталог без QFileSystemWatcher (сеть/огромный), обновляется только вручную
+        self.watched: bool = True
 
         # история как в проводнике
-        self.history: list[Path] = []
+        self.history: "deque[Path]" = deque(maxlen=_HISTORY_SIZE)
         self.history_index: int = -1
 
         # кнопки навигации
@@ -72,8 +214,116 @@ class FilePanel:
         self.btn_forward = QPushButton("→")
         self.btn_up = QPushButton("↑")
 
+        # str(path) -> QPersistentModelIndex; становится невалидным сам, если модель удалила узел
+        self._idx_cache: "OrderedDict[str, QPersistentModelIndex]" = OrderedDict()
+
+    def index_for(self, path: Path) -> QModelIndex:
+        """model.index(path) с LRU-кэшем, чтобы не искать узел в модели заново при каждой навигации."""
+        key = str(path)
+        cached = self._idx_cache.get(key)
+        if cached is not None and cached.isValid():
+            self._idx_cache.move_to_end(key)
+            return QModelIndex(cached)
+
+        idx = self.model.index(key)
+        if idx.isValid():
+            self._idx_cache[key] = QPersistentModelIndex(idx)
+            self._idx_cache.move_to_end(key)
+            while len(self._idx_cache) > _INDEX_CACHE_SIZE:
+                self._idx_cache.popitem(last=False)
+        else:
+            self._idx_cache.pop(key, None)
+        return idx
+
+
+class _CountSignals(QObject):
+    done = Signal(int, str, str)  # поколение, левая, правая
+
+
+class _CountTask(QRunnable):
+    """Подсчёт объектов в каталогах обеих панелей в пуле потоков Qt (медленная ФС не держит UI)."""
+
+    def __init__(self, gen: int, left: Path, right: Path, count: Callable[[Path], str], signals: _CountSignals):
+        super().__init__()
+        self.gen = gen
+        self.left = left
+        self.right = right
+        self.count = count
+        self.signals = signals
+
+    def _safe_count(self, root: Path) -> str:
+        try:
+            return self.count(root)
+        except Exception:
+            return "-1"
+
+    def run(self):
+        self.signals.done.emit(self.gen, self._safe_count(self.left), self._safe_count(self.right))
+
+
+def _raise_bulk_errors(errors: List[Tuple[Union[str, Path], OSError]]) -> None:
+    # все сбои пакетной операции — одним сообщением, а не только первый
+    if errors:
+        raise OSError("\n".join(f"• {os.path.basename(p)}: {e.strerror or e}" for p, e in errors))
+
+
+class _FileOpSignals(QObject):
+    done = Signal()
+    error = Signal(str)
+    cancelled = Signal()
+    progress = Signal(int)  # обработано файлов
+
+
+class FileOpTask(QRunnable):
+    """
+    Файловая операция (вставка/удаление/переименование) в пуле потоков Qt; итог — через сигналы.
+    Если op — генератор, каждый его шаг считается одним файлом: раз в _PROGRESS_EVERY шагов
+    уходит progress, а между шагами проверяется cancel.
+    """
+
+    def __init__(self, op: Callable[[], Optional[Iterator[object]]]):
+        super().__init__()
+        self.op = op
+        self.signals = _FileOpSignals()
+        self.cancel = threading.Event()
+        # cancel проверяется только между шагами генератора — остальные ops не прервать
+        self.cancellable = inspect.isgeneratorfunction(op)
+
+    def run(self):
+        try:
+            steps = self.op()
+            if steps is not None and not self._drive(steps):
+                self.signals.cancelled.emit()
+                return
+        except Exception as e:
+            self.signals.error.emit(str(e))
+            return
+        self.signals.done.emit()
+
+    def _drive(self, steps: Iterator[object]) -> bool:
+        """Пройти генератор до конца; False — если прервали по cancel."""
+        n = 0
+        for _ in steps:
+            n += 1
+            if self.cancel.is_set():
+                steps.close()  # type: ignore[attr-defined]
+                return False
+            if n % _PROGRESS_EVERY == 0:
+                self.signals.progress.emit(n)
+        return True
+
 
 class FileManagerWindow(QMainWindow):
+    # разобранные QKeySequence общие для всех окон: строка парсится один раз за процесс
+    _SHORTCUTS: Dict[Union[str, int], QKeySequence] = {}
+
+    @classmethod
+    def _shortcut(cls, spec: Union[str, int]) -> QKeySequence:
+        seq = cls._SHORTCUTS.get(spec)
+        if seq is None:
+            seq = cls._SHORTCUTS[spec] = QKeySequence(spec)
+        return seq
+
     def __init__(self):
         super().__init__()
         self.setWindowTitle("Файловый менеджер (двухпанельный)")
@@ -82,6 +332,22 @@ class FileManagerWindow(QMainWindow):
         self.clipboard = Clipboard()
         self.active: str = "L"  # "L" or "R"
 
+        # path -> (st_mtime_ns, count): пересчитываем только если каталог изменился
+        self._dir_count_cache: "OrderedDict[Path, Tuple[int, int]]" = OrderedDict()
+        self._fs = FSMetaCache()
+        # кэш читают задачи из пула потоков
+        self._dir_count_lock = threading.Lock()
+
+        # подсчёт для статуса идёт в фоне; устаревшие результаты отбрасываем по номеру поколения
+        self._status_gen = 0
+        self._status_counts: Dict[str, Tuple[Path, str]] = {}
+        self._status_roots: Tuple[Path, Path] = (Path.home(), Path.home())
+        self._count_signals = _CountSignals(self)
+        self._count_signals.done.connect(self._on_status_counts)
+
+        # запущенные файловые операции: держим ссылки, пока не придёт итог
+        self._file_ops: set[FileOpTask] = set()
+
         # ===== Panels =====
         self.left = FilePanel()
         self.right = FilePanel()
@@ -89,28 +355,29 @@ class FileManagerWindow(QMainWindow):
         # Важно: активность панели должна определяться и кликом, и фокусом (клавиатура!)
         self.left.view.clicked.connect(lambda _: self.set_active("L"))
         self.right.view.clicked.connect(lambda _: self.set_active("R"))
+        self._left_view = self.left.view
+        self._right_view = self.right.view
         self.left.view.installEventFilter(self)
         self.right.view.installEventFilter(self)
 
-        self.left.view.doubleClicked.connect(lambda idx: self.on_double_click(self.left, idx))
-        self.right.view.doubleClicked.connect(lambda idx: self.on_double_click(self.right, idx))
+        # partial вместо lambda: аргументы сигнала (idx/pos) дописываются в конец как есть
+        self.left.view.doubleClicked.connect(partial(self.on_double_click, self.left))
+        self.right.view.doubleClicked.connect(partial(self.on_double_click, self.right))
 
         self.left.view.setContextMenuPolicy(Qt.CustomContextMenu)
         self.right.view.setContextMenuPolicy(Qt.CustomContextMenu)
-        self.left.view.customContextMenuRequested.connect(lambda pos: self.open_context_menu(self.left, pos))
-        self.right.view.customContextMenuRequested.connect(lambda pos: self.open_context_menu(self.right, pos))
+        self.left.view.customContextMenuRequested.connect(partial(self.open_context_menu, self.left))
+        self.right.view.customContextMenuRequested.connect(partial(self.open_context_menu, self.right))
+        self._build_context_menu()
 
         # ===== Top bar (две панели со стрелками) =====
         def _wire_panel_nav(panel: FilePanel, which: str):
-            panel.btn_back.clicked.connect(lambda: self.go_back(panel))
-            panel.btn_forward.clicked.connect(lambda: self.go_forward(panel))
-            panel.btn_up.clicked.connect(lambda: self.go_up(panel))
-            panel.path_edit.returnPressed.connect(lambda: self.go_to_path(panel))
-
-            # клики по кнопкам/полю тоже делают панель активной
-            panel.btn_back.clicked.connect(lambda: self.set_active(which))
-            panel.btn_forward.clicked.connect(lambda: self.set_active(which))
-            panel.btn_up.clicked.connect(lambda: self.set_active(which))
+            # клики по кнопкам/полю тоже делают панель активной — один слот на кнопку
+            panel.btn_back.clicked.connect(lambda: self._nav_click(which, self.go_back, panel))
+            panel.btn_forward.clicked.connect(lambda: self._nav_click(which, self.go_forward, panel))
+            panel.btn_up.clicked.connect(lambda: self._nav_click(which, self.go_up, panel))
+            panel.path_edit.returnPressed.connect(partial(self.go_to_path, panel))
+
             panel.path_edit.focusInEvent = lambda e, w=which, old=panel.path_edit.focusInEvent: (self.set_active(w),
                                                                                                  old(e))
 
@@ -169,6 +436,32 @@ class FileManagerWindow(QMainWindow):
         self.status = QStatusBar()
         self.setStatusBar(self.status)
 
+        # строка с каталогами панелей; временные сообщения показываются поверх неё
+        self._status_label = QLabel()
+        self.status.addWidget(self._status_label, 1)
+
+        # прогресс и отмена фоновых операций — постоянные виджеты, статус-сообщения их не затирают
+        self._op_label = QLabel()
+        self._cancel_btn = QPushButton("Отмена")
+        self._cancel_btn.clicked.connect(self.cancel_file_ops)
+        self.status.addPermanentWidget(self._op_label)
+        self.status.addPermanentWidget(self._cancel_btn)
+        self._op_label.hide()
+        self._cancel_btn.hide()
+
+        # update_status только взводит таймер: серия вызовов (обе панели, refresh) — один пересчёт
+        self._status_timer = QTimer(self)
+        self._status_timer.setSingleShot(True)
+        self._status_timer.setInterval(50)
+        self._status_timer.timeout.connect(self._do_update_status)
+
+        # QFileSystemModel сам следит за каталогами (QFileSystemWatcher): после операций
+        # панели обновляются по его сигналам, а статус пересчитывается одним срабатыванием таймера
+        for p in (self.left, self.right):
+            p.model.directoryLoaded.connect(self._on_model_changed)
+            p.model.rowsInserted.connect(self._on_model_changed)
+            p.model.rowsRemoved.connect(self._on_model_changed)
+
         # Start dirs
         self.set_panel_dir(self.left, Path.home())
         self.set_panel_dir(self.right, Path.home())
@@ -179,27 +472,31 @@ class FileManagerWindow(QMainWindow):
     def go_back(self, panel: FilePanel):
         if panel.history_index > 0:
             panel.history_index -= 1
-            self.set_panel_dir(panel, panel.history[panel.history_index], push_history=False)
+            self.set_panel_dir(panel, panel.history[panel.history_index], push_history=False, trusted=True)
 
     def go_forward(self, panel: FilePanel):
         if panel.history_index < len(panel.history) - 1:
             panel.history_index += 1
-            self.set_panel_dir(panel, panel.history[panel.history_index], push_history=False)
+            self.set_panel_dir(panel, panel.history[panel.history_index], push_history=False, trusted=True)
 
     def go_up(self, panel: FilePanel):
         cur = panel.root
         parent = cur.parent
         if parent != cur:
-            self.set_panel_dir(panel, parent)
+            self.set_panel_dir(panel, parent, trusted=True)
 
 
     def eventFilter(self, obj, event):
+        # фильтр видит каждое событие view (hover, paint, ...): всё, кроме FocusIn, отпускаем
+        # одним сравнением, без захода в базовый eventFilter (он для чужих объектов вернёт False)
+        if event.type() != _FOCUS_IN:
+            return False
+
         # если пользователь перемещается клавиатурой/Tab/кликает — ловим фокус
-        if event.type() == QEvent.FocusIn:
-            if obj is self.left.view:
-                self.set_active("L")
-            elif obj is self.right.view:
-                self.set_active("R")
+        if obj is self._left_view:
+            self.set_active("L")
+        elif obj is self._right_view:
+            self.set_active("R")
         return super().eventFilter(obj, event)
 
     # ===================== UTILS =====================
@@ -207,11 +504,17 @@ class FileManagerWindow(QMainWindow):
     def _act(self, text, fn, shortcut=None):
         a = QAction(text, self)
         if shortcut:
-            a.setShortcut(QKeySequence(shortcut))
+            a.setShortcut(self._shortcut(shortcut))
         a.triggered.connect(fn)
         return a
 
+    def _nav_click(self, which: str, action, panel: FilePanel):
+        self.set_active(which)
+        action(panel)
+
     def set_active(self, which: str):
+        if which == self.active:
+            return  # панель уже активна — не перерисовываем статус
         self.active = which
         self.status.showMessage(f"Активная панель: {'левая' if which=='L' else 'правая'}", 1000)
 
@@ -225,63 +528,124 @@ class FileManagerWindow(QMainWindow):
         panel.btn_back.setEnabled(panel.history_index > 0)
         panel.btn_forward.setEnabled(panel.history_index < len(panel.history) - 1)
 
-    def set_panel_dir(self, panel: FilePanel, path: Path, push_history: bool = True):
-        path = path.expanduser().resolve()
-        if not path.exists() or not path.is_dir():
+    def set_panel_dir(self, panel: FilePanel, path: Path, push_history: bool = True, trusted: bool = False):
+        """
+        trusted=True — путь уже абсолютный и нормализованный (из модели или истории):
+        нормализацию и проверку на симлинк пропускаем, это нужно только для введённого вручную.
+        """
+        if not trusted:
+            path = self._normalize_typed_path(path)
+            if path is None:
+                return
+
+        key = str(path)
+        if panel.shown_path == key and path == panel.root:
+            # тот же каталог: модель и view уже показывают его — ни stat, ни повтора в истории
+            self.update_status()
+            return
+
+        if not self._fs.is_dir(path):
             self.show_error(f"Папка не существует: {path}")
             return
 
         if push_history:
             # если мы “откатились назад” и идём в новую папку — обрезаем хвост
-            if panel.history_index < len(panel.history) - 1:
-                panel.history = panel.history[: panel.history_index + 1]
+            while len(panel.history) > panel.history_index + 1:
+                panel.history.pop()
             panel.history.append(path)
-            panel.history_index += 1
+            # при переполнении deque сам выкинул самую старую запись
+            panel.history_index = len(panel.history) - 1
 
         panel.root = path
-        panel.path_edit.setText(str(path))
-        idx = panel.model.index(str(path))
-        if idx.isValid():
-            panel.view.setRootIndex(idx)
+        panel.path_edit.setText(key)
+        if key != panel.shown_path:
+            watch = _should_watch(key)
+            if watch != panel.watched:
+                panel.model.setOption(QFileSystemModel.DontWatchForChanges, not watch)
+                panel.watched = watch
+            # на время смены корня — без сортировки и перерисовок; сортировку (колонка и порядок
+            # остаются в заголовке) включаем после первой порции строк
+            view = panel.view
+            view.setUpdatesEnabled(False)
+            view.setSortingEnabled(False)
+            try:
+                # корень модели = текущий каталог: Qt догружает и отслеживает его, а не "/"
+                panel.model.setRootPath(key)
+                idx = panel.index_for(path)
+                if idx.isValid():
+                    view.setRootIndex(idx)
+                    panel.shown_path = key
+            finally:
+                view.setUpdatesEnabled(True)
+            QTimer.singleShot(0, partial(self._restore_sorting, view))
 
         self.update_panel_nav_buttons(panel)
         self.update_status()
 
+    @staticmethod
+    def _restore_sorting(view: QTreeView):
+        # при быстрой навигации таймеров может быть несколько — сортируем один раз
+        if not view.isSortingEnabled():
+            view.setSortingEnabled(True)
+
+    def _normalize_typed_path(self, path: Path) -> Optional[Path]:
+        # дешёвая нормализация вместо resolve() (readlink+stat на каждый компонент — больно на NFS/SMB);
+        # полный resolve только если сам каталог — симлинк
+        path = Path(os.path.abspath(os.path.expanduser(str(path))))
+        if os.path.islink(path):
+            try:
+                path = path.resolve()
+            except (OSError, RuntimeError) as e:
+                self.show_error(f"Не удалось открыть ссылку: {path} ({e})")
+                return None
+        return path
+
     def go_to_path(self, panel: FilePanel):
         self.set_panel_dir(panel, Path(panel.path_edit.text()))
 
     # ===================== SELECTION =====================
 
-    def selected_paths(self, panel: FilePanel) -> List[Path]:
+    def selected_paths(self, panel: FilePanel) -> List[str]:
+        # строки, а не Path: при Ctrl+A на 10k строк — без лишнего объекта на каждую
         sel = panel.view.selectionModel().selectedRows(0)
-        return [Path(panel.model.filePath(i)) for i in sel]
+        fp = panel.model.filePath
+        return [fp(i) for i in sel]
 
-    def current_item(self, panel: FilePanel) -> Optional[Path]:
+    def _current_str(self, panel: FilePanel) -> Optional[str]:
+        # сырой путь из модели: Path строим только там, где он действительно нужен
         idx = panel.view.currentIndex()
         if not idx.isValid():
             return None
-        return Path(panel.model.filePath(idx))
+        return panel.model.filePath(idx)
+
+    def current_item(self, panel: FilePanel) -> Optional[Path]:
+        s = self._current_str(panel)
+        return Path(s) if s else None
 
     def paste_target_dir(self, panel: FilePanel) -> Path:
         # Ctrl+V / вставка: если выделена папка — в неё, иначе в корень панели
-        p = self.current_item(panel)
-        if p and p.exists():
-            return p if p.is_dir() else p.parent
+        s = self._current_str(panel)
+        if s:
+            if self._fs.is_dir(s):
+                return Path(s)
+            if self._fs.exists(s):
+                return Path(os.path.dirname(s))
         return panel.root
 
     # ===================== DOUBLE CLICK =====================
 
     def on_double_click(self, panel: FilePanel, index: QModelIndex):
-        p = Path(panel.model.filePath(index))
+        s = panel.model.filePath(index)
 
-        if is_locked(p):
-            self.show_error(f"Объект заблокирован: {p.name}")
+        if is_locked(s):
+            self.show_error(f"Объект заблокирован: {os.path.basename(s)}")
             return
 
-        if p.is_dir():
-            self.set_panel_dir(panel, p)
+        if self._fs.is_dir(s):
+            # путь из модели уже абсолютный — без нормализации
+            self.set_panel_dir(panel, Path(s), trusted=True)
         else:
-            QDesktopServices.openUrl(QUrl.fromLocalFile(str(p)))
+            QDesktopServices.openUrl(QUrl.fromLocalFile(s))
 
     # ===================== HOTKEYS =====================
 
@@ -292,7 +656,7 @@ class FileManagerWindow(QMainWindow):
         self.addAction(self._hk(QKeySequence.Delete, self.delete_selected))
 
         a_rename = QAction(self)
-        a_rename.setShortcut(QKeySequence(Qt.Key_F2))
+        a_rename.setShortcut(self._shortcut(Qt.Key_F2))
         a_rename.triggered.connect(self.rename_selected)
         self.addAction(a_rename)
 
@@ -310,7 +674,7 @@ class FileManagerWindow(QMainWindow):
         if not items:
             return
 
-        p = items[0]
+        p = Path(items[0])
         if is_locked(p):
             self.show_error(f"Объект заблокирован: {p.name}")
             return
@@ -324,7 +688,7 @@ class FileManagerWindow(QMainWindow):
         if not items:
             return
 
-        p = items[0]
+        p = Path(items[0])
         if is_locked(p):
             self.show_error(f"Объект заблокирован: {p.name}")
             return
@@ -348,7 +712,8 @@ class FileManagerWindow(QMainWindow):
             self.show_error(f"Объект заблокирован: {src.name}")
             return
 
-        dst_dir = dst_dir.expanduser().resolve()
+        # цель приходит из panel.root или из модели — путь уже абсолютный, resolve() не нужен
+        dst_dir = Path(os.path.abspath(os.path.expanduser(str(dst_dir))))
 
         # 2️⃣ Проверка: нельзя вставлять в заблокированную папку
         if is_locked(dst_dir):
@@ -356,45 +721,113 @@ class FileManagerWindow(QMainWindow):
             return
 
         dst = dst_dir / src.name
+        is_cut = self.clipboard.is_cut
 
+        # здесь только проверки и диалоги (UI-поток); само копирование/перенос — в FileOpTask
         try:
-            if src.is_dir():
-                # ===== Вставка папки =====
-                if dst.exists() and dst.is_dir():
-                    if not self.confirm_merge_dirs(dst.name):
-                        return
-
-                    logger.info("MERGE_DIR | %s -> %s", src, dst)
-                    merge_copy_dir(src, dst)
-
-                    if self.clipboard.is_cut:
-                        remove_any(src)
-
+            # по одному stat на источник и цель вместо цепочки is_dir()/exists()/is_file()
+            src_is_dir = stat.S_ISDIR(os.stat(src).st_mode)
+            try:
+                dst_mode = os.stat(dst).st_mode
+            except FileNotFoundError:
+                dst_mode = None
+            dst_exists = dst_mode is not None
+            dst_is_dir = dst_exists and stat.S_ISDIR(dst_mode)
+
+            if src_is_dir and dst_is_dir:
+                # ===== Вставка папки в существующую: слияние =====
+                if not self.confirm_merge_dirs(dst.name):
+                    return
+
+                if is_cut and same_device(src, dst):
+                    # вырезание в пределах раздела — слияние переименованиями, без копирования
+                    def op():
+                        logger.info("MERGE_MOVE_DIR | %s -> %s", src, dst)
+                        merge_move_dir(src, dst)
                 else:
-                    if dst.exists() and dst.is_file():
-                        dst = unique_dir_path(dst)
+                    # генератор: по файлу за шаг — прогресс и отмена в FileOpTask
+                    def op():
+                        logger.info("MERGE_DIR | %s -> %s", src, dst)
+                        yield from merge_copy_dir_iter(src, dst)
 
-                    if self.clipboard.is_cut:
-                        move_any(src, dst)
-                    else:
-                        copy_any(src, dst)
+                        if is_cut:
+                            remove_any(src)
 
             else:
-                # ===== Вставка файла =====
-                if dst.exists():
+                if src_is_dir:
+                    # ===== Вставка папки =====
+                    if dst_exists and stat.S_ISREG(dst_mode):
+                        dst = unique_dir_path(dst)
+                elif dst_exists:
+                    # ===== Вставка файла =====
                     dst = unique_file_path(dst)
 
-                if self.clipboard.is_cut:
-                    move_any(src, dst)
-                else:
-                    copy_any(src, dst)
+                op = partial(move_any if is_cut else copy_any, src, dst)
 
         except Exception as e:
             self.show_error(f"Ошибка вставки: {e}")
             return
 
+        # буфер освобождаем сразу, чтобы повторный Ctrl+V не запустил ту же операцию;
+        # при ошибке возвращаем его, если пользователь ничего нового не скопировал
+        clip = self.clipboard
         self.clipboard = Clipboard()
-        self.refresh_panels()
+
+        def finish(ok: bool):
+            if is_cut:
+                clear_path_cache()
+            if not ok and self.clipboard.src is None:
+                self.clipboard = clip
+
+        self._run_file_op("Вставка", op, "Ошибка вставки", finish)
+
+    def _run_file_op(
+        self,
+        title: str,
+        op: Callable[[], Optional[Iterator[object]]],
+        error_prefix: str,
+        on_finish: Optional[Callable[[bool], None]] = None,
+    ):
+        """Запустить op в пуле потоков; on_finish(ok) и ошибка — уже в GUI-потоке."""
+        task = FileOpTask(op)
+
+        def _finish(ok: bool):
+            self._file_ops.discard(task)
+            self._after_fs_change()
+            if on_finish is not None:
+                on_finish(ok)
+            self._update_op_widgets()
+            self.update_status()
+
+        def _error(msg: str):
+            _finish(False)
+            self.show_error(f"{error_prefix}: {msg}")
+
+        def _cancelled():
+            _finish(False)
+            self.status.showMessage(f"{title}: отменено", 3000)
+
+        task.signals.done.connect(lambda: _finish(True))
+        task.signals.error.connect(_error)
+        task.signals.cancelled.connect(_cancelled)
+        task.signals.progress.connect(lambda n: self._op_label.setText(f"{title}: файлов {n}"))
+        self._file_ops.add(task)
+
+        self._op_label.setText(f"{title}…")
+        self._update_op_widgets()
+        QThreadPool.globalInstance().start(task)
+
+    def cancel_file_ops(self):
+        # прерывает операции, идущие по шагам (слияние папок); остальные доделаются сами
+        for task in self._file_ops:
+            if task.cancellable:
+                task.cancel.set()
+
+    def _update_op_widgets(self):
+        busy = bool(self._file_ops)
+        self._op_label.setVisible(busy)
+        # «Отмена» — только если есть что прерывать
+        self._cancel_btn.setVisible(any(t.cancellable for t in self._file_ops))
 
     # ===================== CREATE / RENAME / DELETE =====================
 
@@ -413,7 +846,7 @@ class FileManagerWindow(QMainWindow):
         try:
             logger.info("MKDIR | %s", folder)
             folder.mkdir(parents=False)
-            self.refresh_panels()
+            self._after_fs_change()
         except Exception as e:
             self.show_error(f"Ошибка создания папки: {e}")
 
@@ -437,7 +870,7 @@ class FileManagerWindow(QMainWindow):
         try:
             logger.info("CREATE_FILE | %s", p)
             core_create_file(p)
-            self.refresh_panels()
+            self._after_fs_change()
         except Exception as e:
             self.show_error(f"Ошибка создания файла: {e}")
 
@@ -456,16 +889,25 @@ class FileManagerWindow(QMainWindow):
             return
 
         new_path = p.parent / new_name.strip()
-        if new_path.exists():
+
+        # на POSIX os.rename молча перезаписывает файл, поэтому без lexists не обойтись;
+        # FileExistsError (Windows / гонка) ловим отдельно
+        if os.path.lexists(new_path):
             self.show_error("Файл/папка с таким именем уже существует.")
             return
 
         try:
             logger.info("RENAME | %s -> %s", p, new_path)
-            p.rename(new_path)
-            self.refresh_panels()
+            os.rename(p, new_path)
+            self._after_fs_change()
+        except FileExistsError:
+            self.show_error("Файл/папка с таким именем уже существует.")
+            return
         except Exception as e:
             self.show_error(f"Ошибка переименования: {e}")
+            return
+
+        clear_path_cache()
 
     def delete_selected(self):
         panel = self.active_panel()
@@ -473,9 +915,12 @@ class FileManagerWindow(QMainWindow):
         if not items:
             return
 
-        locked = [x for x in items if is_locked(x)]
-        if locked:
-            self.show_error("Есть заблокированные объекты:\n" + "\n".join(f"• {x.name}" for x in locked))
+        # без заблокированных (обычный случай) — один проход без списка;
+        # иначе в сообщении не больше _LOCKED_SHOWN имён
+        first = next((i for i, x in enumerate(items) if is_locked(x)), None)
+        if first is not None:
+            shown = list(islice((x for x in items[first:] if is_locked(x)), _LOCKED_SHOWN))
+            self.show_error("Есть заблокированные объекты:\n" + "\n".join(f"• {os.path.basename(x)}" for x in shown))
             return
 
         if QMessageBox.question(
@@ -486,38 +931,62 @@ class FileManagerWindow(QMainWindow):
         ) != QMessageBox.Yes:
             return
 
-        try:
-            for x in items:
-                remove_any(x)
-            self.refresh_panels()
-        except Exception as e:
-            self.show_error(f"Ошибка удаления: {e}")
+        def op():
+            _raise_bulk_errors(bulk_remove(items))
+
+        self._run_file_op("Удаление", op, "Ошибка удаления")
 
     # ===================== CONTEXT MENU =====================
 
     def open_context_menu(self, panel: FilePanel, pos):
         self.set_active("L" if panel is self.left else "R")  # важно: меню делает панель активной
 
-        menu = QMenu(self)
         idx = panel.view.indexAt(pos)
-        target = Path(panel.model.filePath(idx)) if idx.isValid() else None
+        target = panel.model.filePath(idx) if idx.isValid() else None
 
         # вставка всегда в "правильную" цель
-        paste_dir = (target if (target and target.is_dir()) else (target.parent if target else panel.root))
-
         if target:
-            menu.addAction(self._mk_action("Открыть", lambda: self.open_item(target)))
-            menu.addSeparator()
-            menu.addAction(self._mk_action("Копировать", self.copy_selected))
-            menu.addAction(self._mk_action("Вырезать", self.cut_selected))
-            menu.addAction(self._mk_action("Вставить", lambda: self.paste_item(paste_dir), enabled=self.clipboard.src is not None))
-            menu.addSeparator()
-            menu.addAction(self._mk_action("Переименовать", self.rename_selected))
-            menu.addAction(self._mk_action("Удалить", self.delete_selected))
-            menu.addSeparator()
-            menu.addAction(self._mk_action("Свойства", lambda: self.show_properties(target)))
+            paste_dir = Path(target if self._fs.is_dir(target) else os.path.dirname(target))
         else:
-            menu.addAction(self._mk_action("Вставить", lambda: self.paste_item(panel.root), enabled=self.clipboard.src is not None))
+            paste_dir = panel.root
+
+        # меню и действия созданы один раз — только перенацеливаем их
+        self._ctx_target = target
+        self._ctx_paste_dir = paste_dir
+        for a in self._ctx_target_actions:
+            a.setVisible(bool(target))
+        self._ctx_paste.setEnabled(self.clipboard.src is not None)
+
+        self._ctx_menu.exec(panel.view.viewport().mapToGlobal(pos))
+
+    def _build_context_menu(self):
+        menu = self._ctx_menu = QMenu(self)
+        self._ctx_target: Optional[str] = None
+        self._ctx_paste_dir: Optional[Path] = None
+
+        self._ctx_paste = self._mk_action("Вставить", self._ctx_paste_item)
+
+        # None — разделитель; флаг — действие видно только при клике по элементу
+        items = [
+            (self._mk_action("Открыть", self._ctx_open), True),
+            (None, True),
+            (self._mk_action("Копировать", self.copy_selected), True),
+            (self._mk_action("Вырезать", self.cut_selected), True),
+            (self._ctx_paste, False),
+            (None, True),
+            (self._mk_action("Переименовать", self.rename_selected), True),
+            (self._mk_action("Удалить", self.delete_selected), True),
+            (None, True),
+            (self._mk_action("Свойства", self._ctx_properties), True),
+        ]
+        self._ctx_target_actions = []
+        for a, only_target in items:
+            if a is None:
+                a = menu.addSeparator()
+            else:
+                menu.addAction(a)
+            if only_target:
+                self._ctx_target_actions.append(a)
 
         menu.addSeparator()
         menu.addAction(self._mk_action("Создать папку", self.create_folder))
@@ -529,7 +998,17 @@ class FileManagerWindow(QMainWindow):
         menu.addAction(self._mk_action("Пакетное переименование…", self.open_batch_rename))
         menu.addAction(self._mk_action("Массовые атрибуты…", self.open_attrs))
 
-        menu.exec(panel.view.viewport().mapToGlobal(pos))
+    def _ctx_open(self):
+        if self._ctx_target:
+            self.open_item(self._ctx_target)
+
+    def _ctx_paste_item(self):
+        if self._ctx_paste_dir is not None:
+            self.paste_item(self._ctx_paste_dir)
+
+    def _ctx_properties(self):
+        if self._ctx_target:
+            self.show_properties(Path(self._ctx_target))
 
     def _mk_action(self, text, fn, enabled=True):
         a = QAction(text, self)
@@ -537,16 +1016,20 @@ class FileManagerWindow(QMainWindow):
         a.triggered.connect(fn)
         return a
 
-    def open_item(self, p: Path):
-        if is_locked(p):
-            self.show_error(f"Объект заблокирован: {p.name}")
+    def open_item(self, p: Union[str, Path]):
+        # строка из модели идёт в QUrl как есть, без Path->str
+        s = os.fspath(p)
+        if is_locked(s):
+            self.show_error(f"Объект заблокирован: {os.path.basename(s)}")
             return
-        if p.is_dir():
-            self.set_panel_dir(self.active_panel(), p)
+        if self._fs.is_dir(s):
+            self.set_panel_dir(self.active_panel(), Path(s))
         else:
-            QDesktopServices.openUrl(QUrl.fromLocalFile(str(p)))
+            QDesktopServices.openUrl(QUrl.fromLocalFile(s))
 
     def show_properties(self, p: Path):
+        from ui.properties_dialog import PropertiesDialog
+
         dlg = PropertiesDialog(p, self)
         dlg.exec()
 
@@ -555,14 +1038,18 @@ class FileManagerWindow(QMainWindow):
     def open_search(self):
         # ВАЖНО: поиск запускается из АКТИВНОЙ панели
         panel = self.active_panel()
+        from ui.search_dialog import SearchDialog
+
         dlg = SearchDialog(panel.root, self)
         if dlg.exec():
             p = dlg.get_selected()
             if p:
-                self.set_panel_dir(panel, p if p.is_dir() else p.parent)
+                self.set_panel_dir(panel, p if self._fs.is_dir(p) else p.parent)
 
     def open_compare(self):
         # сравнение всегда: левая vs правая (как в двухпанельниках)
+        from ui.compare_dialog import CompareDialog
+
         dlg = CompareDialog(self.left.root, self)
         dlg.right_root = self.right.root
         dlg.right_edit.setText(str(self.right.root))
@@ -576,23 +1063,24 @@ class FileManagerWindow(QMainWindow):
             self.show_error("Ничего не выбрано.")
             return
 
-        dlg = BatchRenameDialog(items, self)
+        from ui.batch_rename_dialog import BatchRenameDialog
+
+        dlg = BatchRenameDialog([Path(x) for x in items], self)
         if dlg.exec():
             plan = dlg.get_plan()
             if not plan:
                 self.show_error("Сначала нажми «Предпросмотр», чтобы сформировать план.")
                 return
-            try:
-                for it in plan:
-                    it.src.rename(it.dst)
-                self.refresh_panels()
-            except Exception as e:
-                self.show_error(f"Ошибка переименования: {e}")
+            def op():
+                _raise_bulk_errors(bulk_rename((it.src, it.dst) for it in plan))
+
+            # кэш путей сбрасываем и после частичного успеха — часть файлов уже переименована
+            self._run_file_op("Переименование", op, "Ошибка переименования", lambda ok: clear_path_cache())
 
     def open_attrs(self):
         panel = self.active_panel()
 
-        items = self.selected_paths(panel)
+        items = [Path(x) for x in self.selected_paths(panel)]
         if not items:
             cur = self.current_item(panel)
             if cur:
@@ -601,33 +1089,117 @@ class FileManagerWindow(QMainWindow):
                 self.show_error("Ничего не выбрано.")
                 return
 
+        from core.attrs import apply_attrs
+        from ui.attrs_dialog import AttrsDialog
+
         dlg = AttrsDialog(items, self)
         if dlg.exec():
             try:
                 apply_attrs(items, dlg.get_request())
-                self.refresh_panels()
             except Exception as e:
                 self.show_error(f"Ошибка изменения атрибутов: {e}")
+            finally:
+                # и после частичного успеха: часть атрибутов уже изменена
+                self._after_fs_change()
 
     # ===================== REFRESH / STATUS =====================
 
     def refresh_panels(self):
-        self.set_panel_dir(self.left, self.left.root)
-        self.set_panel_dir(self.right, self.right.root)
+        # F5 — в т.ч. после внешних изменений: кэш поиска и список монтирований могли устареть
+        clear_search_cache()
+        _mounts.cache_clear()
+        self.refresh_panel(self.left)
+        self.refresh_panel(self.right)
+        self.update_status()
 
-    def update_status(self):
-        try:
-            l_count = sum(1 for _ in self.left.root.iterdir())
-        except Exception:
-            l_count = -1
-        try:
-            r_count = sum(1 for _ in self.right.root.iterdir())
-        except Exception:
-            r_count = -1
+    def _after_fs_change(self):
+        # после собственных операций: сбросить кэши и обновить панели без watcher'а
+        self._fs.invalidate()
+        clear_search_cache()
+        self._refresh_unwatched()
+
+    def _refresh_unwatched(self):
+        # панели без watcher'а сами изменений не увидят
+        for panel in (self.left, self.right):
+            if not panel.watched:
+                self.refresh_panel(panel)
+
+    def refresh_panel(self, panel: FilePanel):
+        """
+        Пересканировать текущий каталог панели без навигации: без resolve(),
+        без записи в историю и без смены root index у view.
+        setRootPath с тем же путём Qt игнорирует, поэтому сначала уводим корень модели.
+        """
+        panel.model.setRootPath(QDir.rootPath())
+        panel.model.setRootPath(str(panel.root))
+
+    def _dir_count(self, root: Path) -> int:
+        """
+        Число объектов в каталоге, не больше _DIR_COUNT_CAP + 1 (значит «больше cap»);
+        кэш по mtime каталога (LRU на _DIR_COUNT_CACHE_SIZE).
+        """
+        mtime_ns = os.stat(root).st_mtime_ns
+        with self._dir_count_lock:
+            cached = self._dir_count_cache.get(root)
+            if cached is not None and cached[0] == mtime_ns:
+                self._dir_count_cache.move_to_end(root)
+                return cached[1]
+
+        with os.scandir(root) as it:
+            count = sum(1 for _ in islice(it, _DIR_COUNT_CAP + 1))
+
+        with self._dir_count_lock:
+            self._dir_count_cache[root] = (mtime_ns, count)
+            self._dir_count_cache.move_to_end(root)
+            while len(self._dir_count_cache) > _DIR_COUNT_CACHE_SIZE:
+                self._dir_count_cache.popitem(last=False)
+        return count
+
+    @staticmethod
+    def _fmt_count(n: int) -> str:
+        return f"{_DIR_COUNT_CAP}+" if n > _DIR_COUNT_CAP else str(n)
+
+    def _on_model_changed(self, *_):
+        # dataChanged (атрибуты, время) число объектов не меняет — на него не подписаны
+        self.update_status()
 
-        self.status.showMessage(
-            f"Левая: {self.left.root} (объектов: {l_count}) | "
-            f"Правая: {self.right.root} (объектов: {r_count}) | "
+    def update_status(self):
+        self._status_timer.start()
+
+    def _do_update_status(self):
+        self._status_gen += 1
+        left, right = self.left.root, self.right.root
+
+        # пока идёт подсчёт — прежнее число, если каталог панели не сменился
+        def _shown(which: str, root: Path) -> str:
+            prev = self._status_counts.get(which)
+            return prev[1] if prev and prev[0] == root else "подсчёт…"
+
+        self._status_roots = (left, right)
+        self._show_status(left, _shown("L", left), right, _shown("R", right))
+
+        task = _CountTask(
+            self._status_gen,
+            left,
+            right,
+            lambda root: self._fmt_count(self._dir_count(root)),
+            self._count_signals,
+        )
+        QThreadPool.globalInstance().start(task)
+
+    def _on_status_counts(self, gen: int, l_count: str, r_count: str):
+        if gen != self._status_gen:
+            return  # пока считали, статус запросили снова
+        left, right = self._status_roots
+        self._status_counts = {"L": (left, l_count), "R": (right, r_count)}
+        self._show_status(left, l_count, right, r_count)
+
+    def _show_status(self, left: Path, l_count: str, right: Path, r_count: str):
+        # постоянная строка — в виджете: временные showMessage ("отменено" и т.п.) её не затирают,
+        # а она не затирает их, пока не истечёт их таймаут
+        self._status_label.setText(
+            f"Левая: {left} (объектов: {l_count}) | "
+            f"Правая: {right} (объектов: {r_count}) | "
             f"Активная: {'левая' if self.active=='L' else 'правая'}"
         )
 
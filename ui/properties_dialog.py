@@ -1,7 +1,11 @@
 from __future__ import annotations
 
+import os
+import stat
+import time
+from functools import lru_cache
 from pathlib import Path
-from datetime import datetime
+from typing import Optional
 
 from PySide6.QtWidgets import (
     QDialog,
@@ -14,22 +18,21 @@ from PySide6.QtWidgets import (
 
 def _fmt_dt(ts: float) -> str:
     try:
-        return datetime.fromtimestamp(ts).strftime("%Y-%m-%d %H:%M:%S")
+        return time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(ts))
     except Exception:
         return "—"
 
 
+_SIZE_UNITS = ("B", "KB", "MB", "GB", "TB")
+
+
+@lru_cache(maxsize=256)
 def _fmt_size(num: int) -> str:
-    # человекочитаемый размер
-    units = ["B", "KB", "MB", "GB", "TB"]
-    size = float(num)
-    for u in units:
-        if size < 1024 or u == units[-1]:
-            if u == "B":
-                return f"{int(size)} {u}"
-            return f"{size:.2f} {u}"
-        size /= 1024
-    return f"{num} B"
+    # человекочитаемый размер: единица — по числу бит, без цикла делений
+    if num < 1024:
+        return f"{num} B"
+    shift = min((num.bit_length() - 1) // 10, len(_SIZE_UNITS) - 1)
+    return f"{num / (1 << (10 * shift)):.2f} {_SIZE_UNITS[shift]}"
 
 
 class PropertiesDialog(QDialog):
@@ -39,25 +42,25 @@ class PropertiesDialog(QDialog):
         self.setMinimumWidth(520)
 
         p = path
-        exists = p.exists()
+
+        # один stat на всё: тип, размер и даты берём из него
+        try:
+            st: Optional[os.stat_result] = os.stat(p)
+        except (OSError, ValueError):
+            st = None
+        is_dir = st is not None and stat.S_ISDIR(st.st_mode)
 
         layout = QVBoxLayout(self)
         form = QFormLayout()
 
         form.addRow("Имя:", QLabel(p.name))
         form.addRow("Путь:", QLabel(str(p)))
-        form.addRow("Тип:", QLabel("Папка" if p.is_dir() else "Файл"))
-
-        if exists:
-            try:
-                st = p.stat()
-                form.addRow("Размер:", QLabel(_fmt_size(st.st_size) if p.is_file() else "—"))
-                form.addRow("Создан:", QLabel(_fmt_dt(getattr(st, "st_ctime", 0))))
-                form.addRow("Изменён:", QLabel(_fmt_dt(getattr(st, "st_mtime", 0))))
-            except Exception:
-                form.addRow("Размер:", QLabel("—"))
-                form.addRow("Создан:", QLabel("—"))
-                form.addRow("Изменён:", QLabel("—"))
+        form.addRow("Тип:", QLabel("Папка" if is_dir else "Файл"))
+
+        if st is not None:
+            form.addRow("Размер:", QLabel(_fmt_size(st.st_size) if stat.S_ISREG(st.st_mode) else "—"))
+            form.addRow("Создан:", QLabel(_fmt_dt(getattr(st, "st_ctime", 0))))
+            form.addRow("Изменён:", QLabel(_fmt_dt(getattr(st, "st_mtime", 0))))
         else:
             form.addRow("Статус:", QLabel("Не существует"))
 
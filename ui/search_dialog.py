@@ -1,7 +1,21 @@
+from __future__ import annotations
+
+import threading
+from heapq import merge
 from pathlib import Path
-from typing import Optional
+from typing import Dict, List, Optional
 
-from PySide6.QtCore import Qt, QUrl
+from PySide6.QtCore import (
+    QAbstractListModel,
+    QModelIndex,
+    QObject,
+    QRunnable,
+    QThreadPool,
+    QTimer,
+    Qt,
+    QUrl,
+    Signal,
+)
 from PySide6.QtGui import QDesktopServices
 from PySide6.QtWidgets import (
     QCheckBox,
@@ -9,8 +23,7 @@ from PySide6.QtWidgets import (
     QHBoxLayout,
     QLabel,
     QLineEdit,
-    QListWidget,
-    QListWidgetItem,
+    QListView,
     QPushButton,
     QVBoxLayout,
     QMessageBox,
@@ -19,6 +32,187 @@ from PySide6.QtWidgets import (
 from core.search import search_paths
 
 
+# сколько путей отдавать в GUI за один сигнал
+_BATCH_SIZE = 200
+# пауза после ввода, прежде чем запускать поиск
+_TYPING_DELAY_MS = 250
+# сколько результатов показывать в списке сразу; остальное — по кнопке "Показать все"
+_VISIBLE_CAP = 500
+# роль модели с готовым QUrl строки (для QDesktopServices.openUrl)
+_URL_ROLE = Qt.UserRole + 1
+
+
+class SearchResultsModel(QAbstractListModel):
+    """
+    Список найденных путей: строка модели — просто str пути,
+    Path для UserRole строится только при обращении.
+    Строки отсортированы по пути без учёта регистра. В список попадают cap первых
+    по порядку путей, остальные ждут в _overflow, вместо них — одна строка-итог "… ещё N".
+    """
+
+    def __init__(self, parent=None, cap: int = _VISIBLE_CAP):
+        super().__init__(parent)
+        self.cap = cap
+        self._rows: List[str] = []
+        # casefold-ключи строк, параллельно _rows и в том же порядке
+        self._keys: List[str] = []
+        self._overflow: List[str] = []
+        # после "Показать все" потолок не действует до следующего set_rows
+        self._uncapped = False
+        # QUrl строится при первом открытии строки, а не на каждую найденную
+        self._urls: Dict[str, QUrl] = {}
+
+    @property
+    def hidden_count(self) -> int:
+        return len(self._overflow)
+
+    def set_rows(self, rows: List[str]) -> None:
+        ordered = sorted(rows, key=str.casefold)
+        self.beginResetModel()
+        self._rows = ordered[:self.cap]
+        self._keys = [r.casefold() for r in self._rows]
+        self._overflow = ordered[self.cap:]
+        self._uncapped = False
+        self._urls.clear()
+        self.endResetModel()
+
+    def append_rows(self, rows: List[str]) -> None:
+        """
+        Пачка сортируется и сливается с уже показанными строками за один проход:
+        финальная сортировка не нужна, а view получает одно изменение раскладки на пачку.
+        Пока действует потолок, в списке — cap наименьших путей из найденных;
+        вытесненные и не попавшие уходят в _overflow.
+        """
+        if not rows:
+            return
+        batch = sorted((r.casefold(), r) for r in rows)
+        merged = list(merge(zip(self._keys, self._rows), batch))
+        if not self._uncapped and len(merged) > self.cap:
+            extra = merged[self.cap:]
+            merged = merged[:self.cap]
+        else:
+            extra = []
+
+        self.layoutAboutToBeChanged.emit()
+        old_rows = self._rows
+        old_tail = len(old_rows)
+        self._keys = [k for k, _ in merged]
+        self._rows = [r for _, r in merged]
+        self._overflow.extend(r for _, r in extra)
+        self._remap_persistent(old_rows, old_tail)
+        self.layoutChanged.emit()
+
+    def _remap_persistent(self, old_rows: List[str], old_tail: int) -> None:
+        # выделение/текущая строка переезжают вместе со своим путём; ушедшие в _overflow — сбрасываются
+        persistent = self.persistentIndexList()
+        if not persistent:
+            return
+        new_row = {r: i for i, r in enumerate(self._rows)}
+        tail = len(self._rows)
+        new = []
+        for idx in persistent:
+            row = idx.row()
+            if row >= old_tail:
+                new.append(self.index(tail) if self._overflow else QModelIndex())
+            else:
+                i = new_row.get(old_rows[row])
+                new.append(self.index(i) if i is not None else QModelIndex())
+        self.changePersistentIndexList(persistent, new)
+
+    def show_all(self) -> None:
+        """Перенести отложенные пути в список (по кнопке "Показать все")."""
+        self._uncapped = True
+        if not self._overflow:
+            return
+        self.beginResetModel()
+        self._rows = sorted(self._rows + self._overflow, key=str.casefold)
+        self._keys = [r.casefold() for r in self._rows]
+        self._overflow = []
+        self.endResetModel()
+
+    def path(self, row: int) -> Optional[Path]:
+        # строка-итог пути не имеет
+        return Path(self._rows[row]) if row < len(self._rows) else None
+
+    def url(self, row: int) -> Optional[QUrl]:
+        if row >= len(self._rows):
+            return None
+        s = self._rows[row]
+        u = self._urls.get(s)
+        if u is None:
+            u = self._urls[s] = QUrl.fromLocalFile(s)
+        return u
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self._rows) + (1 if self._overflow else 0)
+
+    def flags(self, index):
+        if index.isValid() and index.row() >= len(self._rows):
+            return Qt.NoItemFlags
+        return super().flags(index)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row = index.row()
+        if row >= len(self._rows):
+            if role == Qt.DisplayRole:
+                return f"… ещё {len(self._overflow)} — уточните запрос"
+            return None
+        if role == Qt.DisplayRole:
+            return self._rows[row]
+        if role == Qt.UserRole:
+            return self.path(row)
+        if role == _URL_ROLE:
+            return self.url(row)
+        return None
+
+
+class _SearchSignals(QObject):
+    batch = Signal(list)  # List[str]
+    finished = Signal(int)  # всего найдено
+
+
+class _SearchTask(QRunnable):
+    """search_paths в пуле потоков Qt; результаты уходят в GUI пачками по _BATCH_SIZE."""
+
+    def __init__(self, root: Path, query: str, recursive: bool, limit: int):
+        super().__init__()
+        self.root = root
+        self.query = query
+        self.recursive = recursive
+        self.limit = limit
+        self.cancel = threading.Event()
+        self.signals = _SearchSignals()
+        self._buf: List[str] = []
+
+    def _collect(self, paths: List[str]) -> None:
+        # search_paths вызывает on_batch последовательно (под отдельным lock)
+        self._buf.extend(paths)
+        if len(self._buf) >= _BATCH_SIZE:
+            self.signals.batch.emit(self._buf)
+            self._buf = []
+
+    def run(self):
+        try:
+            results = search_paths(
+                self.root,
+                self.query,
+                recursive=self.recursive,
+                limit=self.limit,
+                cancel=self.cancel,
+                on_batch=self._collect,
+            )
+        except Exception:
+            results = []
+        if self._buf:
+            self.signals.batch.emit(self._buf)
+            self._buf = []
+        self.signals.finished.emit(len(results))
+
+
 class SearchDialog(QDialog):
     """
     Диалог поиска файлов и папок.
@@ -32,6 +226,11 @@ class SearchDialog(QDialog):
 
         self.start_dir = start_dir
         self.selected_path: Optional[Path] = None
+        self._selected_url: Optional[QUrl] = None
+        self._task: Optional[_SearchTask] = None
+        # ссылки на все ещё идущие поиски (и отменённые тоже — пока не пришёл finished)
+        self._running: set[_SearchTask] = set()
+        self._found = 0
 
         self.query_edit = QLineEdit()
         self.query_edit.setPlaceholderText("Введите часть имени файла или папки")
@@ -42,14 +241,25 @@ class SearchDialog(QDialog):
         self.btn_search = QPushButton("Найти")
         self.btn_search.clicked.connect(self.do_search)
 
+        # поиск по мере ввода: новый обход — только после паузы, а не на каждую букву
+        self._typing_timer = QTimer(self)
+        self._typing_timer.setSingleShot(True)
+        self._typing_timer.setInterval(_TYPING_DELAY_MS)
+        self._typing_timer.timeout.connect(lambda: self.do_search(quiet=True))
+        self.query_edit.textChanged.connect(lambda _: self._typing_timer.start())
+
         top = QHBoxLayout()
         top.addWidget(QLabel("Поиск:"))
         top.addWidget(self.query_edit, 1)
         top.addWidget(self.btn_search)
 
-        self.listw = QListWidget()
-        self.listw.itemDoubleClicked.connect(self.open_item)
-        self.listw.currentItemChanged.connect(self.on_select)
+        self.model = SearchResultsModel(self)
+        self.view = QListView()
+        self.view.setModel(self.model)
+        self.view.setEditTriggers(QListView.NoEditTriggers)
+        self.view.setUniformItemSizes(True)  # все строки одной высоты — без sizeHint на каждую
+        self.view.doubleClicked.connect(self.open_item)
+        self.view.selectionModel().currentChanged.connect(self.on_select)
 
         self.info = QLabel("")
 
@@ -61,75 +271,132 @@ class SearchDialog(QDialog):
         self.btn_goto.setEnabled(False)
         self.btn_goto.clicked.connect(self.goto_selected_dir)
 
+        self.btn_more = QPushButton("Показать все")
+        self.btn_more.setVisible(False)
+        self.btn_more.clicked.connect(self.show_all)
+
         self.btn_close = QPushButton("Закрыть")
         self.btn_close.clicked.connect(self.reject)
 
         bottom = QHBoxLayout()
         bottom.addWidget(self.btn_open)
         bottom.addWidget(self.btn_goto)
+        bottom.addWidget(self.btn_more)
         bottom.addStretch(1)
         bottom.addWidget(self.btn_close)
 
         layout = QVBoxLayout(self)
         layout.addLayout(top)
         layout.addWidget(self.recursive_cb)
-        layout.addWidget(self.listw, 1)
+        layout.addWidget(self.view, 1)
         layout.addWidget(self.info)
         layout.addLayout(bottom)
 
-    def do_search(self):
-        """Запуск поиска."""
-        self.listw.clear()
+    def do_search(self, quiet: bool = False):
+        """Запуск поиска (в фоне; предыдущий поиск отменяется)."""
+        self._typing_timer.stop()
+        self._cancel_search()
+
+        self.model.set_rows([])
         self.selected_path = None
+        self._selected_url = None
         self.btn_open.setEnabled(False)
         self.btn_goto.setEnabled(False)
+        self.btn_more.setVisible(False)
 
         query = self.query_edit.text().strip()
         if not query:
-            QMessageBox.information(self, "Поиск", "Введите строку для поиска.")
+            self.info.setText("")
+            if not quiet:
+                QMessageBox.information(self, "Поиск", "Введите строку для поиска.")
             return
 
         recursive = self.recursive_cb.isChecked()
 
-        results = search_paths(
-            self.start_dir,
-            query,
-            recursive=recursive,
-            limit=5000,
-        )
+        task = _SearchTask(self.start_dir, query, recursive, limit=5000)
+        # пачки от уже отменённого поиска отбрасываем
+        task.signals.batch.connect(lambda paths: self._append_batch(task, paths))
+        task.signals.finished.connect(lambda n: self._search_finished(task, n))
+        self._task = task
+        self._running.add(task)
+        self._found = 0
 
-        self.info.setText(
-            f"Найдено объектов: {len(results)} (папка: {self.start_dir})"
-        )
+        self.info.setText(f"Поиск… (папка: {self.start_dir})")
+        QThreadPool.globalInstance().start(task)
 
-        for p in results:
-            item = QListWidgetItem(str(p))
-            item.setData(Qt.UserRole, p)
-            self.listw.addItem(item)
+    def _cancel_search(self):
+        if self._task is not None:
+            self._task.cancel.set()
+            self._task = None
 
-    def on_select(self, item: Optional[QListWidgetItem], _prev):
+    def _append_batch(self, task: _SearchTask, paths: List[str]):
+        if task is not self._task:
+            return
+        self._found += len(paths)
+        self.info.setText(f"Поиск… найдено: {self._found} (папка: {self.start_dir})")
+
+        # одно изменение раскладки на пачку; элементов-виджетов на строку нет
+        self.model.append_rows(paths)
+
+    def _search_finished(self, task: _SearchTask, total: int):
+        self._running.discard(task)
+        if task is not self._task:
+            return
+        self._task = None
+        self._show_total(total)
+
+    def _show_total(self, total: int):
+        hidden = self.model.hidden_count
+        self.btn_more.setVisible(hidden > 0)
+        if hidden:
+            self.info.setText(
+                f"Найдено объектов: {total}, показано {total - hidden} (папка: {self.start_dir})"
+            )
+        else:
+            self.info.setText(
+                f"Найдено объектов: {total} (папка: {self.start_dir})"
+            )
+
+    def show_all(self):
+        """Показать и отложенные результаты (после окончания поиска)."""
+        self.model.show_all()
+        self._show_total(self._found)
+
+    def reject(self):
+        # «Закрыть»/Esc — останавливаем обход, чтобы потоки не работали впустую
+        self._typing_timer.stop()
+        self._cancel_search()
+        super().reject()
+
+    def accept(self):
+        self._typing_timer.stop()
+        self._cancel_search()
+        super().accept()
+
+    def on_select(self, current: QModelIndex, _prev):
         """Выбор элемента в списке."""
-        if not item:
+        if not current.isValid():
             self.selected_path = None
+            self._selected_url = None
             self.btn_open.setEnabled(False)
             self.btn_goto.setEnabled(False)
             return
 
-        self.selected_path = item.data(Qt.UserRole)
-        self.btn_open.setEnabled(True)
-        self.btn_goto.setEnabled(True)
+        self.selected_path = self.model.path(current.row())
+        self._selected_url = self.model.url(current.row())
+        self.btn_open.setEnabled(self.selected_path is not None)
+        self.btn_goto.setEnabled(self.selected_path is not None)
 
-    def open_item(self, item: QListWidgetItem):
+    def open_item(self, index: QModelIndex):
         """Двойной клик по результату."""
-        path: Path = item.data(Qt.UserRole)
-        QDesktopServices.openUrl(QUrl.fromLocalFile(str(path)))
+        url = self.model.url(index.row())
+        if url is not None:
+            QDesktopServices.openUrl(url)
 
     def open_selected(self):
         """Открыть выбранный файл/папку."""
-        if self.selected_path:
-            QDesktopServices.openUrl(
-                QUrl.fromLocalFile(str(self.selected_path))
-            )
+        if self._selected_url is not None:
+            QDesktopServices.openUrl(self._selected_url)
 
     def goto_selected_dir(self):
         """